@@ -1,11 +1,16 @@
 import streamlit as st
 
+from market_data import get_breaker, get_info_cache, get_price_cache, get_warmer, start_warmer
+
 st.set_page_config(
     page_title="Stock Analysis Dashboard - Documentation",
     page_icon="📚",
     layout="wide"
 )
 
+# Preload common price series in the background (once per server process)
+start_warmer()
+
 # Header and Quick Tip
 st.title("📚 Stock Analysis Dashboard")
 
@@ -90,6 +95,29 @@ with st.expander("🚀 Quick Start Guide"):
     4. Explore analysis features
     """)
 
+# Data layer status
+with st.expander("📡 Data Layer Status"):
+    price_flights = get_price_cache().flights.stats()
+    info_flights = get_info_cache().flights.stats()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Price downloads**")
+        st.write("Requested:", price_flights["requested"])
+        st.write("Downloaded:", price_flights["executed"])
+        st.write("Coalesced:", price_flights["coalesced"])
+    with col2:
+        st.markdown("**Company info lookups**")
+        st.write("Requested:", info_flights["requested"])
+        st.write("Downloaded:", info_flights["executed"])
+        st.write("Coalesced:", info_flights["coalesced"])
+    st.write("**Provider circuit breaker:**", get_breaker().state)
+    warmup = get_warmer().status
+    if warmup["state"] == "running":
+        st.progress(warmup["done"] / max(warmup["total"], 1),
+                    text=f"Warming price cache: {warmup['done']} of {warmup['total']} symbols")
+    elif warmup["state"] == "done":
+        st.write("**Price cache warm-up:**", f"complete ({warmup['total'] - len(warmup['failed'])} symbols loaded)")
+
 # Footer
 st.markdown("---")
 st.markdown("""
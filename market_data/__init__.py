@@ -0,0 +1,107 @@
+"""Data access helpers shared by the dashboard pages."""
+from market_data.cache import (
+    data_age_caption,
+    data_quality_notes,
+    get_bars,
+    get_close_matrices,
+    get_close_prices,
+    get_history,
+    get_price_cache,
+)
+from market_data.fundamentals import get_info_cache, iter_info
+from market_data.fx import convert_prices, fx_pairs, fx_symbol
+from market_data.intraday import IntradayCache, RingBuffer, get_intraday_bars, get_intraday_cache
+from market_data.providers import (
+    LocalFileProvider,
+    MarketDataProvider,
+    RecordingProvider,
+    ReplayProvider,
+    YFinanceProvider,
+    get_provider,
+)
+from market_data.quality import QualityReport, clean_bars
+from market_data.resilience import CircuitBreaker, CircuitOpenError, FetchBudget, get_breaker
+from market_data.returns import (
+    RETURN_FIELDS,
+    compound_returns,
+    covariance,
+    total_return_index,
+    weighted_returns,
+)
+from market_data.shared import SharedCache, get_shared_cache
+from market_data.snapshot import FundamentalsSnapshot, get_snapshot
+from market_data.symbols import SymbolDirectory, get_directory, parse_tickers, validate_tickers
+from market_data.universe import (
+    BENCHMARKS,
+    DEFAULT_PORTFOLIO,
+    NASDAQ_100,
+    UNIVERSE,
+    UniverseTensor,
+    build_universe,
+    open_universe,
+)
+from market_data.warmup import CacheWarmer, get_warmer, start_warmer
+from market_data.widgets import (
+    load_close_matrices,
+    show_fetch_progress,
+    show_quality_notes,
+    show_window_note,
+)
+
+__all__ = [
+    "BENCHMARKS",
+    "DEFAULT_PORTFOLIO",
+    "NASDAQ_100",
+    "RETURN_FIELDS",
+    "UNIVERSE",
+    "CacheWarmer",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "FetchBudget",
+    "FundamentalsSnapshot",
+    "IntradayCache",
+    "LocalFileProvider",
+    "MarketDataProvider",
+    "QualityReport",
+    "RecordingProvider",
+    "ReplayProvider",
+    "RingBuffer",
+    "SharedCache",
+    "SymbolDirectory",
+    "UniverseTensor",
+    "YFinanceProvider",
+    "build_universe",
+    "clean_bars",
+    "compound_returns",
+    "convert_prices",
+    "covariance",
+    "data_age_caption",
+    "data_quality_notes",
+    "fx_pairs",
+    "fx_symbol",
+    "get_bars",
+    "get_breaker",
+    "get_close_matrices",
+    "get_close_prices",
+    "get_directory",
+    "get_history",
+    "get_info_cache",
+    "get_intraday_bars",
+    "get_intraday_cache",
+    "get_price_cache",
+    "get_provider",
+    "get_shared_cache",
+    "get_snapshot",
+    "get_warmer",
+    "iter_info",
+    "load_close_matrices",
+    "open_universe",
+    "parse_tickers",
+    "show_fetch_progress",
+    "show_quality_notes",
+    "show_window_note",
+    "start_warmer",
+    "total_return_index",
+    "validate_tickers",
+    "weighted_returns",
+]
@@ -0,0 +1,690 @@
+"""Per-ticker price cache shared by every page and session."""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from market_data import config
+from market_data.calendar import align_prices, late_starts
+from market_data.fx import convert_prices, fx_pairs, needs_conversion
+from market_data.providers import get_provider
+from market_data.quality import QualityReport, clean_bars
+from market_data.returns import total_return_index
+from market_data.scheduler import get_scheduler, is_transient
+from market_data.shared import get_shared_cache
+from market_data.singleflight import SingleFlight
+from market_data.snapshot import get_snapshot, has_company_info
+from market_data.store import PYRAMID_LEVELS, BarStore, resample_bars
+from market_data.universe import open_universe
+
+
+def to_timestamp(value):
+    """Normalize date/datetime/str inputs to a midnight Timestamp."""
+    return pd.Timestamp(value).normalize()
+
+
+def read_only_frame(frame, dtype="float64", index=None):
+    """Rebuild ``frame`` on a single read-only ``dtype`` block.
+
+    Row slices of the result are views, and any attempt to write into it
+    raises instead of silently changing data other sessions are reading.
+    Passing ``index`` lets frames over the same dates share one index object.
+    """
+    values = frame.to_numpy(dtype=dtype, copy=True)
+    values.flags.writeable = False
+    index = frame.index if index is None else index
+    return pd.DataFrame(values, index=index, columns=frame.columns, copy=False)
+
+
+def returns_frame(prices):
+    """Read-only daily returns of ``prices``, in the same dtype and on the same index.
+
+    The division runs in float64 so compact matrices only lose precision
+    once, when the result is stored.
+    """
+    returns = prices.astype("float64").pct_change()
+    return read_only_frame(returns, dtype=prices.to_numpy().dtype, index=prices.index)
+
+
+def aligned_matrices(prices):
+    """Read-only (prices, returns) of ``prices`` aligned on its master trading calendar.
+
+    Returns start on the second session, so neither frame has missing rows
+    from the calendar itself.
+    """
+    aligned = read_only_frame(align_prices(prices), dtype=prices.to_numpy().dtype)
+    return aligned, returns_frame(aligned).iloc[1:]
+
+
+class MatrixRecord:
+    """A shared read-only price matrix and what is derived from it, computed lazily.
+
+    ``entries`` are the cache entries (or the universe tensor) it was built
+    from; the record is reused for as long as they have not been replaced.
+    """
+
+    def __init__(self, entries, prices):
+        self.entries = entries
+        self.prices = prices
+        self._aligned = None
+        self._late = None
+
+    @property
+    def aligned(self):
+        # (prices, returns) on the master trading calendar, built once per record
+        if self._aligned is None:
+            self._aligned = aligned_matrices(self.prices)
+        return self._aligned
+
+    @property
+    def late(self):
+        # {ticker: first date with a price} for tickers that move the calendar's start
+        if self._late is None:
+            self._late = late_starts(self.prices)
+        return self._late
+
+
+@dataclass
+class CacheEntry:
+    frame: pd.DataFrame
+    start: pd.Timestamp
+    end: pd.Timestamp
+    error: str = None
+    fetched_at: float = field(default_factory=time.time)
+    refreshing: bool = False
+    # Column subset the entry was loaded with, None for full bars
+    columns: tuple = None
+    # What cleaning found in the series when it was cached
+    quality: QualityReport = None
+
+    def covers(self, start, end):
+        return self.start <= start and end <= self.end
+
+    def has_columns(self, columns):
+        # Projected entries (loaded from the store for a column subset) can't serve full bars
+        if self.error is not None or self.columns is None:
+            return True
+        return columns is not None and set(columns) <= set(self.columns)
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def slice(self, start, end, columns=None):
+        # Positional slicing keeps the result a view of the shared frame
+        index = self.frame.index
+        rows = slice(index.searchsorted(start), index.searchsorted(end))
+        if columns is None or self.error is not None:
+            return self.frame.iloc[rows]
+        return self.frame.iloc[rows][list(columns)]
+
+
+class PriceCache:
+    """Caches OHLCV bars per (ticker, interval) so pages only download the
+    symbols and date ranges they have not seen before.
+
+    With a ``BarStore`` attached, misses are served from disk and only the
+    date gaps the store has never seen are downloaded.
+
+    Entries older than ``ttl`` seconds are stale: they are still served
+    immediately while a background worker re-downloads their most recent
+    bars. Failed lookups are retried once their ttl has passed.
+
+    Cached frames are read-only and every caller gets views of them, so
+    each series and each assembled price matrix is held once per process.
+
+    With a ``SharedCache`` next to the store, server processes take a lease
+    before downloading a series; the others wait and read the result from
+    the store, and skip refreshes another process has just done.
+    """
+
+    def __init__(self, store=None, ttl=None, max_matrices=32, shared=None):
+        self._entries = {}
+        self._matrices = OrderedDict()
+        self.max_matrices = max_matrices
+        self._lock = threading.Lock()
+        self._store = store
+        self._shared = shared if store is not None else None
+        self.ttl = ttl
+        self.flights = SingleFlight()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="price-refresh")
+
+    def get_history(self, tickers, start_date, end_date, interval="1d", progress=None, budget=None,
+                    columns=None):
+        """Return ({ticker: OHLCV frame}, {ticker: error}) for the range.
+
+        Cached tickers are sliced locally; misses are fetched in batches by
+        the shared scheduler within the optional ``FetchBudget``.
+        ``progress(done, total)`` is called as each downloaded ticker arrives.
+
+        ``columns`` projects the result, e.g. ``("Close",)`` or
+        ``("Total Return",)``. Full bars are always stored, but a projected
+        miss only reads the columns it needs back from the Parquet store.
+
+        When the provider is failing (timeouts, open circuit breaker) any
+        partial cached data is returned and the ticker is also listed in the
+        error dict; such results are not cached.
+        """
+        start, end = to_timestamp(start_date), to_timestamp(end_date)
+        tickers = list(dict.fromkeys(tickers))
+        columns = tuple(columns) if columns is not None else None
+        stored = _stored_columns(columns)
+        frames, failures, missing = {}, {}, []
+
+        with self._lock:
+            for ticker in tickers:
+                entry = self._entries.get((ticker, interval))
+                if entry is None or not entry.covers(start, end) or not entry.has_columns(stored):
+                    missing.append(ticker)
+                elif entry.error:
+                    if self._is_stale(entry):
+                        missing.append(ticker)
+                    else:
+                        failures[ticker] = entry.error
+                else:
+                    frames[ticker] = entry.slice(start, end, columns)
+                    if self._is_stale(entry) and not entry.refreshing:
+                        entry.refreshing = True
+                        self._refresher.submit(self._refresh, ticker, interval)
+
+        if missing:
+            fetched, fetch_failures = self._fetch_coalesced(missing, start, end, interval, progress,
+                                                            budget, stored)
+            with self._lock:
+                for ticker in missing:
+                    key = (ticker, interval)
+                    error = fetch_failures.get(ticker)
+                    if error is None:
+                        # Without a store the download itself is kept, which always has full bars
+                        projection = stored if self._store is not None else None
+                        entry = self._entries[key] = self._merge(key, fetched[ticker], start, end, projection)
+                        frames[ticker] = entry.slice(start, end, columns)
+                        continue
+
+                    failures[ticker] = error
+                    if ticker in fetched:
+                        # Partial data from the store while the provider is failing
+                        frames[ticker] = _clean_entry(fetched[ticker], start, end, interval).slice(
+                            start, end, columns)
+                    elif is_transient(error):
+                        entry = self._entries.get(key)
+                        if (entry is not None and not entry.error and entry.has_columns(stored)
+                                and not entry.slice(start, end).empty):
+                            frames[ticker] = entry.slice(start, end, columns)
+                    else:
+                        self._entries[key] = CacheEntry(pd.DataFrame(), start, end, error)
+
+        return {t: frames[t] for t in tickers if t in frames}, failures
+
+    def _is_stale(self, entry):
+        return self.ttl is not None and entry.age() > self.ttl
+
+    def _refresh(self, ticker, interval):
+        # Only the tail of a series changes, so re-download the last few days
+        key = (ticker, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return
+        try:
+            self._refresh_entry(key, entry)
+        finally:
+            # Also after a failed store read or cleaning, or the entry would never refresh again
+            with self._lock:
+                self._entries.get(key, entry).refreshing = False
+
+    def _refresh_entry(self, key, entry):
+        ticker, interval = key
+        if entry.frame.empty:
+            tail_start = entry.start
+        else:
+            tail_start = max(entry.start, entry.frame.index.max().normalize() - pd.Timedelta(days=7))
+
+        name = _lease_name(ticker, interval)
+        tail, fetched_at, leased = None, time.time(), False
+        if self._shared is not None:
+            stamp = self._shared.get("refreshed", name, max_age=self.ttl)
+            if stamp is None:
+                leased = self._shared.acquire(name)
+                if not leased:
+                    self._shared.wait([name], self._shared.lease_ttl)
+                    stamp = self._shared.get("refreshed", name, max_age=self.ttl)
+            if stamp is not None:
+                # Another server process refreshed it recently, its bars are in the store
+                tail = self._store.read(ticker, interval, tail_start, entry.end, entry.columns)
+                fetched_at = stamp[1]
+        try:
+            if tail is None:
+                tail = self._download_tail(ticker, interval, entry, tail_start)
+        finally:
+            if leased:
+                self._shared.release(name)
+        if tail is None:
+            return
+
+        with self._lock:
+            current = self._entries.get(key, entry)
+            merged = pd.concat([current.frame, tail])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            self._entries[key] = _clean_entry(merged, current.start, current.end, interval,
+                                              fetched_at=fetched_at, columns=current.columns)
+
+    def _download_tail(self, ticker, interval, entry, tail_start):
+        [result] = get_scheduler().fetch([([ticker], tail_start, entry.end, interval)])
+        if result.error is not None:
+            return None
+        tail = result.frame
+        if self._store is not None:
+            # The store always gets full bars, even when the entry is a projection
+            covered_until = min(entry.end, pd.Timestamp.now().normalize())
+            self._store.append(ticker, interval, tail, tail_start, covered_until)
+        if self._shared is not None:
+            self._shared.put("refreshed", _lease_name(ticker, interval), True)
+        if entry.columns is not None:
+            tail = tail[[c for c in entry.columns if c in tail.columns]]
+        return tail
+
+    def get_bars(self, ticker, start_date, end_date, resolution="1d", budget=None):
+        """Return (OHLCV bars at ``resolution``, error) for one ticker.
+
+        Weekly ("1wk") and monthly ("1mo") bars are built from the daily ones:
+        read from the store's precomputed pyramid when there is a store,
+        otherwise aggregated from the cached daily series. Each bar is
+        labelled with the start of its period and only aggregates days in
+        the requested range.
+        """
+        frames, failures = self.get_history([ticker], start_date, end_date, budget=budget)
+        if ticker not in frames or resolution == "1d":
+            return frames.get(ticker), failures.get(ticker)
+        daily, bars = frames[ticker], None
+        if self._store is not None and not daily.empty:
+            bars = self._store.read_level(ticker, "1d", resolution, to_timestamp(start_date),
+                                          to_timestamp(end_date))
+        if bars is None or bars.empty:
+            bars = resample_bars(daily, resolution)
+        else:
+            # Stored bars cover whole periods, so the two holding the range's
+            # ends are rebuilt from the requested days only
+            periods = daily.index.to_period(PYRAMID_LEVELS[resolution])
+            edges = resample_bars(daily[periods.isin([periods[0], periods[-1]])], resolution)
+            inner = bars.loc[(bars.index > edges.index[0]) & (bars.index < edges.index[-1])]
+            bars = pd.concat([edges.iloc[:1], inner, edges.iloc[1:]])
+        return read_only_frame(bars), failures.get(ticker)
+
+    def quality(self, tickers, interval="1d"):
+        """Return {ticker: QualityReport} for cached series where cleaning found problems."""
+        with self._lock:
+            entries = {t: self._entries.get((t, interval)) for t in tickers}
+        return {t: e.quality for t, e in entries.items()
+                if e is not None and e.quality is not None and not e.quality.clean}
+
+    def data_age(self, tickers, interval="1d"):
+        """Return (age in seconds of the oldest cached series, whether any is stale)."""
+        with self._lock:
+            entries = [self._entries.get((t, interval)) for t in tickers]
+        entries = [e for e in entries if e is not None and not e.error]
+        if not entries:
+            return None, False
+        return max(e.age() for e in entries), any(self._is_stale(e) for e in entries)
+
+    def _fetch_coalesced(self, tickers, start, end, interval, progress=None, budget=None,
+                         columns=None):
+        # Tickers another session is already downloading for the same range
+        # are waited on instead of being requested a second time
+        keys = {(ticker, interval, start, end, columns): ticker for ticker in tickers}
+        leading, following = self.flights.acquire(keys)
+
+        fetched, failures = {}, {}
+        if leading:
+            try:
+                fetched, failures = self._fetch([keys[k] for k in leading], start, end, interval,
+                                                progress, budget, columns)
+            except Exception as e:
+                for key in leading:
+                    self.flights.release(key, error=e)
+                raise
+            for key in leading:
+                ticker = keys[key]
+                self.flights.release(key, (fetched.get(ticker), failures.get(ticker)))
+
+        for key, call in following.items():
+            # Another session's download doesn't get to overrun this page's budget
+            try:
+                frame, error = call.wait(budget.remaining() if budget is not None else None)
+            except TimeoutError:
+                frame, error = None, "Fetch budget exceeded"
+            if frame is not None:
+                fetched[keys[key]] = frame
+            if error is not None:
+                failures[keys[key]] = error
+        return fetched, failures
+
+    def _lease_downloads(self, tickers, interval, budget=None):
+        # Take the download lease of each ticker; where another server process
+        # holds one, wait for its download to land in the store first
+        names = [_lease_name(ticker, interval) for ticker in tickers]
+        leased = [name for name in names if self._shared.acquire(name)]
+        held = [name for name in names if name not in leased]
+        if held:
+            # Never wait while holding leases, two processes could wait on each other
+            for name in leased:
+                self._shared.release(name)
+            timeout = self._shared.lease_ttl if budget is None else budget.remaining()
+            self._shared.wait(held, timeout)
+            leased = [name for name in names if self._shared.acquire(name)]
+        return leased
+
+    def _fetch(self, tickers, start, end, interval, progress=None, budget=None, columns=None):
+        leased = self._lease_downloads(tickers, interval, budget) if self._shared is not None else []
+        try:
+            return self._fetch_missing(tickers, start, end, interval, progress, budget, columns)
+        finally:
+            for name in leased:
+                self._shared.release(name)
+
+    def _fetch_missing(self, tickers, start, end, interval, progress=None, budget=None,
+                        columns=None):
+        if self._store is None:
+            requests = [(tickers, start, end, interval)]
+        else:
+            # Tickers missing the same date gaps are requested together
+            batches = defaultdict(list)
+            for ticker in tickers:
+                for gap in self._store.missing_ranges(ticker, interval, start, end):
+                    if len(pd.bdate_range(gap[0], gap[1] - pd.Timedelta(days=1))):
+                        batches[gap].append(ticker)
+            requests = [(batch, gap_start, gap_end, interval)
+                        for (gap_start, gap_end), batch in batches.items()]
+
+        total = sum(len(batch) for batch, *_ in requests)
+        # Never mark today as covered, its bar is still changing
+        covered_until = min(end, pd.Timestamp.now().normalize())
+        frames, errors, completed = {}, {}, []
+
+        def on_result(result):
+            completed.append(result.ticker)
+            if result.error is not None:
+                errors[result.ticker] = result.error
+            elif self._store is not None:
+                self._store.append(result.ticker, interval, result.frame,
+                                   result.start, min(result.end, covered_until))
+            else:
+                frames[result.ticker] = result.frame
+            if progress is not None:
+                progress(len(completed), total)
+
+        if requests:
+            get_scheduler().fetch(requests, on_result, budget)
+
+        if self._store is None:
+            return frames, errors
+
+        failures = {}
+        for ticker in tickers:
+            frame = self._store.read(ticker, interval, start, end, columns)
+            if frame.empty:
+                failures[ticker] = errors.get(ticker, "No data returned")
+            else:
+                frames[ticker] = frame
+                if is_transient(errors.get(ticker, "")):
+                    failures[ticker] = errors[ticker]
+        return frames, failures
+
+    def _merge(self, key, frame, start, end, columns=None):
+        # Extend an existing entry when the new range touches it, otherwise replace it
+        entry = self._entries.get(key)
+        if (entry is None or entry.error or start > entry.end or end < entry.start
+                or entry.columns != columns):
+            return _clean_entry(frame, start, end, key[1], columns=columns)
+        merged = pd.concat([entry.frame, frame])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        return _clean_entry(merged, min(start, entry.start), max(end, entry.end), key[1],
+                            fetched_at=entry.fetched_at, columns=columns)
+
+    def get_matrix(self, tickers, start_date, end_date, interval="1d", field="Close",
+                   progress=None, budget=None):
+        """Return (MatrixRecord, {ticker: error}) for one field of ``tickers``.
+
+        The matrix is built once and shared until one of its series changes;
+        results degraded by provider failures are built fresh and not kept.
+        """
+        start, end = to_timestamp(start_date), to_timestamp(end_date)
+        tickers = list(dict.fromkeys(tickers))
+        frames, failures = self.get_history(tickers, start, end, interval, progress, budget,
+                                            columns=(field,))
+
+        key = (tuple(tickers), start, end, interval, field)
+        with self._lock:
+            entries = tuple(self._entries.get((t, interval)) for t in tickers)
+            record = self._matrices.get(key)
+        clean = all(
+            entry is not None and (entry.error is None) == (ticker in frames) == (ticker not in failures)
+            for ticker, entry in zip(tickers, entries)
+        )
+        if not clean:
+            return MatrixRecord(None, _build_matrix(frames, field)), failures
+
+        if record is not None and all(a is b for a, b in zip(record.entries, entries)):
+            with self._lock:
+                self._matrices.move_to_end(key)
+            return record, failures
+
+        frames = {t: e.slice(start, end, (field,)) for t, e in zip(tickers, entries) if e.error is None}
+        record = MatrixRecord(entries, _build_matrix(frames, field))
+        with self._lock:
+            self._matrices[key] = record
+            while len(self._matrices) > self.max_matrices:
+                self._matrices.popitem(last=False)
+        return record, failures
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+
+
+# Stored columns a projection is read with. Close brings Dividends along so
+# one cached entry serves both price and total returns, and Stock Splits so
+# cleaning can tell splits from real price moves.
+SOURCE_COLUMNS = {"Close": ("Close", "Dividends", "Stock Splits"),
+                  "Total Return": ("Close", "Dividends", "Stock Splits")}
+
+
+def _stored_columns(columns):
+    if columns is None:
+        return None
+    return tuple(dict.fromkeys(c for column in columns for c in SOURCE_COLUMNS.get(column, (column,))))
+
+
+def _clean_entry(frame, start, end, interval="1d", **kwargs):
+    # Every series is validated once, when it enters the cache, and its
+    # total-return index is derived then instead of on every page rerun
+    frame, quality = clean_bars(frame.drop(columns="Total Return", errors="ignore"),
+                                freq="B" if interval == "1d" else None)
+    if "Close" in frame.columns:
+        frame = frame.assign(**{"Total Return": total_return_index(frame["Close"], frame.get("Dividends"))})
+    return CacheEntry(read_only_frame(frame), start, end, quality=quality, **kwargs)
+
+
+def _lease_name(ticker, interval):
+    return f"prices/{ticker}/{interval}"
+
+
+def _build_matrix(frames, field):
+    if not frames:
+        return pd.DataFrame()
+    return read_only_frame(pd.concat({t: frame[field] for t, frame in frames.items()}, axis=1),
+                           dtype=config.MATRIX_DTYPE)
+
+
+@st.cache_resource
+def get_price_cache():
+    # Each provider gets its own store so local dumps never mix with live data
+    store = BarStore(Path(config.STORE_DIR) / get_provider().name) if config.STORE_DIR else None
+    return PriceCache(store, ttl=config.PRICE_TTL, shared=get_shared_cache())
+
+
+def get_history(ticker, start_date, end_date, interval="1d", budget=None, columns=None):
+    """OHLCV bars (or the ``columns`` subset) for a single ticker.
+
+    Raises ValueError if the ticker has no data.
+    """
+    frames, failures = get_price_cache().get_history([ticker], start_date, end_date, interval,
+                                                     budget=budget, columns=columns)
+    if ticker not in frames:
+        raise ValueError(f"No data for {ticker}: {failures[ticker]}")
+    return frames[ticker]
+
+
+def get_bars(ticker, start_date, end_date, resolution="1d", budget=None):
+    """Daily, weekly ("1wk") or monthly ("1mo") OHLCV bars for a single ticker.
+
+    Raises ValueError if the ticker has no data.
+    """
+    bars, error = get_price_cache().get_bars(ticker, start_date, end_date, resolution, budget)
+    if bars is None:
+        raise ValueError(f"No data for {ticker}: {error}")
+    return bars
+
+
+def _universe_for(tickers, start, end, field="Close"):
+    # The prebuilt universe tensor answers without touching the cache when it
+    # holds every ticker over the whole range and is recent enough. Bars from
+    # its build day on were still changing, so ranges reaching them go
+    # through the cache and its refresh policy instead.
+    if not config.UNIVERSE_DIR:
+        return None
+    tensor = open_universe()
+    if (tensor is None or tensor.age() > config.UNIVERSE_MAX_AGE or field not in tensor.fields
+            or end > pd.Timestamp(tensor.built_at, unit="s").normalize()
+            or not tensor.covers(tickers, start, end)):
+        return None
+    return tensor
+
+
+# MatrixRecords gathered from the universe tensor, most recently used last
+_universe_matrices = OrderedDict()
+_universe_lock = threading.Lock()
+MAX_UNIVERSE_MATRICES = 32
+
+
+def _gather_from_universe(tickers, start_date, end_date, field="Close"):
+    # Like ``PriceCache.get_matrix``, each matrix (and its aligned pair) is
+    # built once per tensor version and shared by every session
+    start, end = to_timestamp(start_date), to_timestamp(end_date)
+    tickers = list(dict.fromkeys(tickers))
+    tensor = _universe_for(tickers, start, end, field)
+    if tensor is None:
+        return None
+    key = (tensor.path.name, tuple(tickers), start, end, field)
+    with _universe_lock:
+        record = _universe_matrices.get(key)
+        if record is not None:
+            _universe_matrices.move_to_end(key)
+            return record
+    record = MatrixRecord(tensor, read_only_frame(tensor.gather(tickers, start, end, field),
+                                                  dtype=config.MATRIX_DTYPE))
+    with _universe_lock:
+        _universe_matrices[key] = record
+        while len(_universe_matrices) > MAX_UNIVERSE_MATRICES:
+            _universe_matrices.popitem(last=False)
+    return record
+
+
+def get_close_prices(tickers, start_date, end_date, interval="1d", progress=None, budget=None,
+                     field="Close"):
+    """Wide Close (or ``"Total Return"``) matrix assembled from cached per-ticker series.
+
+    Returns a read-only view of the shared matrix and a {ticker: error}
+    dict for symbols without (complete) data.
+    """
+    if interval == "1d":
+        record = _gather_from_universe(tickers, start_date, end_date, field)
+        if record is not None:
+            return record.prices.iloc[:], {}
+    record, failures = get_price_cache().get_matrix(tickers, start_date, end_date, interval, field,
+                                                    progress=progress, budget=budget)
+    return record.prices.iloc[:], failures
+
+
+def get_close_matrices(tickers, start_date, end_date, interval="1d", progress=None, budget=None,
+                       currency=None, field="Close"):
+    """Close prices and daily returns of ``tickers`` aligned on one trading calendar.
+
+    Fetch holdings and benchmarks in one call so they share the calendar:
+    sessions run from the first date every ticker has a price, and a
+    market closed on a session carries its last close over (zero return).
+
+    Prices are converted to ``currency`` (default ``config.BASE_CURRENCY``)
+    using each ticker's currency from the fundamentals snapshot.
+
+    ``field="Total Return"`` uses each series' dividend-reinvested index
+    instead of the Close, so returns include dividends.
+
+    Returns (prices, returns, failures, late); both frames are read-only
+    views and ``late`` maps tickers that start trading well after the others,
+    and so shorten the calendar, to their first date with a price.
+    """
+    record = _gather_from_universe(tickers, start_date, end_date, field) if interval == "1d" else None
+    if record is not None:
+        failures = {}
+    else:
+        record, failures = get_price_cache().get_matrix(tickers, start_date, end_date, interval, field,
+                                                        progress=progress, budget=budget)
+    (prices, returns), late = record.aligned, record.late
+    prices, returns, failures = _convert_currency(prices.iloc[:], returns.iloc[:], failures,
+                                                  currency or config.BASE_CURRENCY, start_date, end_date,
+                                                  interval, budget)
+    return prices, returns, failures, {t: day for t, day in late.items() if t in prices.columns}
+
+
+def _convert_currency(prices, returns, failures, currency, start_date, end_date, interval, budget):
+    # Rates are cached like any other series, once per currency pair
+    snapshot = get_snapshot()
+    snapshot.refresh([t for t in prices.columns if has_company_info(t) and snapshot.get(t) is None],
+                     budget=budget)
+    currencies = {t: (snapshot.get(t) or {}).get("currency") for t in prices.columns}
+    currencies = {t: code for t, code in currencies.items() if code}
+    if not needs_conversion(currencies, currency):
+        return prices, returns, failures
+
+    rates, _ = get_close_prices(fx_pairs(currencies, currency), start_date, end_date, interval,
+                                budget=budget)
+    converted = convert_prices(prices, currencies, rates, currency)
+    unconverted = [t for t in converted.columns if converted[t].isna().all()]
+    failures = {**failures, **{t: f"No {currencies[t]}/{currency} exchange rates" for t in unconverted}}
+    converted = read_only_frame(converted.drop(columns=unconverted), dtype=prices.to_numpy().dtype)
+    return converted, returns_frame(converted).iloc[1:], failures
+
+
+def data_age_caption(tickers, interval="1d", start_date=None, end_date=None, field="Close"):
+    """Short badge text describing how old the data for ``tickers`` is.
+
+    Pass the date range when the prices came from ``get_close_matrices``,
+    which may have read them from the universe tensor rather than the cache.
+    """
+    tensor = None
+    if interval == "1d" and start_date is not None and end_date is not None:
+        tensor = _universe_for(list(dict.fromkeys(tickers)), to_timestamp(start_date), to_timestamp(end_date),
+                               field)
+    if tensor is not None:
+        age, stale = tensor.age(), False
+    else:
+        age, stale = get_price_cache().data_age(tickers, interval)
+    if age is None:
+        return ""
+    minutes = int(age // 60)
+    text = "Data updated just now" if minutes == 0 else f"Data updated {minutes} min ago"
+    if stale:
+        text += " · stale, refreshing in the background"
+    return text
+
+
+def data_quality_notes(tickers, interval="1d"):
+    """One line per ticker whose cached series needed cleaning, for display under a chart."""
+    reports = get_price_cache().quality(tickers, interval)
+    return [f"{ticker}: {report.summary()}" for ticker, report in reports.items()]
@@ -0,0 +1,72 @@
+"""Alignment of price matrices onto one master trading calendar.
+
+Tickers listed on different exchanges (and index benchmarks) trade on
+different days, so a wide Close matrix built from them has holes wherever
+one market was closed. Aligning once, when the matrix is built, gives
+every metric the same contiguous rows instead of re-joining series (and
+producing NaN rows) in each calculation.
+"""
+import numpy as np
+import pandas as pd
+
+from market_data.quality import MAX_FILL
+
+# Longest run of sessions a closed market's last price is carried over; the
+# same limit cleaning uses, so a gap it reports as long isn't filled here at all
+MAX_HOLIDAY_FILL = MAX_FILL
+
+
+def master_calendar(prices):
+    """Sessions on which any column traded, starting once every column has a price.
+
+    ``prices`` is a wide matrix whose index is already the union of its
+    columns' dates, as built by the price cache.
+    """
+    has_price = prices.notna().to_numpy()
+    if has_price.size == 0 or not has_price.any(axis=0).all():
+        return prices.index[:0]
+    first = int(has_price.argmax(axis=0).max())
+    return prices.index[first:]
+
+
+def late_starts(prices, max_gap=MAX_HOLIDAY_FILL):
+    """{column: first date with a price} for columns whose history starts more
+    than ``max_gap`` sessions into ``prices``, moving the master calendar's start.
+    """
+    has_price = prices.notna().to_numpy()
+    if has_price.size == 0:
+        return {}
+    first = has_price.argmax(axis=0)
+    return {column: prices.index[position]
+            for column, position, listed in zip(prices.columns, first, has_price.any(axis=0))
+            if listed and position > max_gap}
+
+
+def fill_short_gaps(prices, max_fill=MAX_HOLIDAY_FILL):
+    """Carry each column's last price over runs of at most ``max_fill`` missing rows.
+
+    Unlike ``ffill(limit=...)``, longer runs are left missing entirely
+    rather than having their first ``max_fill`` rows filled.
+    """
+    values = prices.to_numpy(copy=True)
+    missing = np.isnan(values)
+    if not missing.any():
+        return prices
+    rows = np.arange(len(values))[:, None]
+    # Row of the last price before (and the first price after) each missing cell
+    last_valid = np.maximum.accumulate(np.where(missing, -1, rows), axis=0)
+    next_valid = np.minimum.accumulate(np.where(missing, len(values), rows)[::-1], axis=0)[::-1]
+    fill = missing & (next_valid - last_valid - 1 <= max_fill) & (last_valid >= 0)
+    values[fill] = values[last_valid[fill], np.nonzero(fill)[1]]
+    return pd.DataFrame(values, index=prices.index, columns=prices.columns)
+
+
+def align_prices(prices, calendar=None, max_fill=MAX_HOLIDAY_FILL):
+    """Reindex ``prices`` onto ``calendar`` (by default its master calendar).
+
+    A market closed for up to ``max_fill`` sessions keeps its previous close,
+    so its return there is 0 rather than NaN; longer gaps stay missing.
+    """
+    if calendar is None:
+        calendar = master_calendar(prices)
+    return fill_short_gaps(prices, max_fill).reindex(calendar)
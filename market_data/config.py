@@ -0,0 +1,81 @@
+"""Runtime settings for the data layer, read from environment variables."""
+import os
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Root directory of the on-disk Parquet bar store; set to an empty string to disable it
+STORE_DIR = os.environ.get("MARKET_DATA_DIR", str(APP_DIR / ".market_data"))
+
+# Host-wide SQLite cache (inside STORE_DIR) so server processes share info, refresh times and downloads
+SHARED_CACHE = os.environ.get("MARKET_DATA_SHARED_CACHE", "1") == "1"
+# Seconds a process may hold a download lease before others stop waiting for it
+LEASE_TTL = int(os.environ.get("MARKET_DATA_LEASE_TTL", 120))
+
+# How long fetched company info stays fresh, in seconds
+INFO_TTL = int(os.environ.get("MARKET_DATA_INFO_TTL", 6 * 60 * 60))
+
+# How long rows of the fundamentals snapshot (name, sector, market cap, ...) stay fresh, in seconds
+SNAPSHOT_TTL = int(os.environ.get("MARKET_DATA_SNAPSHOT_TTL", 24 * 60 * 60))
+
+# Upper bound on concurrent info requests
+INFO_MAX_WORKERS = int(os.environ.get("MARKET_DATA_INFO_WORKERS", 8))
+
+# Cached price series older than this (seconds) are served stale and refreshed in the background
+PRICE_TTL = int(os.environ.get("MARKET_DATA_PRICE_TTL", 15 * 60))
+
+# Currency that analysis pages convert all prices into
+BASE_CURRENCY = os.environ.get("MARKET_DATA_CURRENCY", "USD")
+
+# Opt-in float32 storage for the shared Close and returns matrices (halves their memory)
+COMPACT_MATRICES = os.environ.get("MARKET_DATA_COMPACT", "0") == "1"
+MATRIX_DTYPE = "float32" if COMPACT_MATRICES else "float64"
+
+# Where prices and company info come from: "yfinance" or "local"
+PROVIDER = os.environ.get("MARKET_DATA_PROVIDER", "yfinance")
+
+# Directory of CSV/Parquet price dumps read by the "local" provider
+LOCAL_DATA_DIR = os.environ.get("MARKET_DATA_LOCAL_DIR", str(APP_DIR / "data"))
+
+# "record" captures every provider response to RECORD_DIR, "replay" serves them back offline
+RECORD_MODE = os.environ.get("MARKET_DATA_RECORD_MODE", "")
+RECORD_DIR = os.environ.get("MARKET_DATA_RECORD_DIR", str(APP_DIR / "recordings"))
+
+# Provider requests per second shared by all sessions, and the burst allowed on top of it
+FETCH_RATE = float(os.environ.get("MARKET_DATA_FETCH_RATE", 2))
+FETCH_BURST = int(os.environ.get("MARKET_DATA_FETCH_BURST", 5))
+
+# Batches in flight per fetch, tickers per batch, and retries for transient errors
+FETCH_CONCURRENCY = int(os.environ.get("MARKET_DATA_FETCH_CONCURRENCY", 4))
+FETCH_BATCH_SIZE = int(os.environ.get("MARKET_DATA_FETCH_BATCH_SIZE", 20))
+FETCH_RETRIES = int(os.environ.get("MARKET_DATA_FETCH_RETRIES", 3))
+
+# Seconds a single provider call may take, and the total a page may spend fetching
+CALL_TIMEOUT = float(os.environ.get("MARKET_DATA_CALL_TIMEOUT", 20))
+PAGE_FETCH_BUDGET = float(os.environ.get("MARKET_DATA_PAGE_BUDGET", 45))
+
+# Consecutive provider failures that open the circuit breaker, and how long it stays open
+BREAKER_THRESHOLD = int(os.environ.get("MARKET_DATA_BREAKER_THRESHOLD", 5))
+BREAKER_COOLDOWN = float(os.environ.get("MARKET_DATA_BREAKER_COOLDOWN", 60))
+
+# Memory-mapped universe tensor written by `python -m market_data.universe`,
+# and the age (seconds) after which pages stop reading from it
+UNIVERSE_DIR = os.environ.get(
+    "MARKET_DATA_UNIVERSE_DIR", str(Path(STORE_DIR) / "universe") if STORE_DIR else ""
+)
+UNIVERSE_MAX_AGE = int(os.environ.get("MARKET_DATA_UNIVERSE_MAX_AGE", 24 * 60 * 60))
+
+# Intraday bars kept in memory per symbol and interval, how often they are polled (seconds),
+# and how many days an empty buffer loads (Yahoo serves about 7 days of 1m and 60 of 5m bars)
+INTRADAY_CAPACITY = int(os.environ.get("MARKET_DATA_INTRADAY_CAPACITY", 2000))
+INTRADAY_TTL = int(os.environ.get("MARKET_DATA_INTRADAY_TTL", 60))
+INTRADAY_LOOKBACK_1M = int(os.environ.get("MARKET_DATA_INTRADAY_LOOKBACK_1M", 5))
+INTRADAY_LOOKBACK_5M = int(os.environ.get("MARKET_DATA_INTRADAY_LOOKBACK_5M", 30))
+
+# Symbol directory used for search and ticker validation; empty means the bundled list
+SYMBOLS_FILE = os.environ.get("MARKET_DATA_SYMBOLS_FILE", "")
+
+# Background cache warm-up: whether it runs, how many days it loads, and how often (seconds, 0 = once)
+WARMUP_ENABLED = os.environ.get("MARKET_DATA_WARMUP", "1") == "1"
+WARMUP_DAYS = int(os.environ.get("MARKET_DATA_WARMUP_DAYS", 3 * 365))
+WARMUP_INTERVAL = int(os.environ.get("MARKET_DATA_WARMUP_INTERVAL", 6 * 60 * 60))
@@ -0,0 +1,18 @@
+"""Atomic file writes for data other threads and server processes read concurrently."""
+import os
+import threading
+
+
+def write_atomic(path, write):
+    """Replace ``path`` with what ``write(tmp_path)`` writes, in one atomic rename.
+
+    The temporary file is unique per process and thread, so concurrent
+    writers never interleave and readers only ever see a complete file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
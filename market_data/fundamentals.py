@@ -0,0 +1,134 @@
+"""Company info lookups with a TTL cache and a bounded thread pool."""
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+
+import streamlit as st
+
+from market_data import config
+from market_data.providers import get_provider
+from market_data.resilience import get_breaker
+from market_data.scheduler import is_transient
+from market_data.shared import get_shared_cache
+from market_data.singleflight import SingleFlight
+
+
+class InfoCache:
+    """Thread-safe {ticker: info} cache whose entries expire after ``ttl`` seconds.
+
+    With a ``SharedCache`` attached, misses are looked up there and every
+    fetched entry is written through, so other server processes reuse it.
+    """
+
+    def __init__(self, ttl, shared=None):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._shared = shared
+        self.flights = SingleFlight()
+
+    def get(self, ticker, allow_stale=False):
+        with self._lock:
+            entry = self._entries.get(ticker)
+        if self._shared is not None and (entry is None or self._expired(entry)):
+            shared = self._shared.get("info", ticker)
+            if shared is not None and (entry is None or shared[1] > entry[0]):
+                entry = (shared[1], shared[0])
+                with self._lock:
+                    self._entries[ticker] = entry
+        if entry is None or (not allow_stale and self._expired(entry)):
+            return None
+        return entry[1]
+
+    def _expired(self, entry):
+        return time.time() - entry[0] > self.ttl
+
+    def put(self, ticker, info):
+        with self._lock:
+            self._entries[ticker] = (time.time(), info)
+        if self._shared is not None:
+            self._shared.put("info", ticker, info)
+
+
+@st.cache_resource
+def get_info_cache():
+    return InfoCache(config.INFO_TTL, get_shared_cache())
+
+
+def fetch_info(ticker):
+    return get_provider().info(ticker)
+
+
+def _fetch_and_cache(cache, ticker):
+    # Sessions asking for the same ticker at once share a single request
+    def fetch():
+        # Another server process may have fetched it since the caller looked
+        info = cache.get(ticker)
+        if info is not None:
+            return info
+        breaker = get_breaker()
+        breaker.check()
+        try:
+            info = fetch_info(ticker)
+        except Exception as e:
+            # An unknown ticker or missing info file says nothing bad about the
+            # provider's health: it answered, which also ends a half-open trial
+            if is_transient(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        cache.put(ticker, info)
+        return info
+    return cache.flights.do(ticker, fetch)
+
+
+def iter_info(tickers, max_workers=None, budget=None):
+    """Yield (ticker, info, error) as each lookup finishes.
+
+    Fresh cached entries are yielded first without a request; the rest are
+    fetched concurrently on at most ``max_workers`` threads. Lookups still
+    running when the ``FetchBudget`` (or the per-call timeout) runs out are
+    abandoned. A failed lookup yields the expired cached info, if any,
+    together with the error.
+    """
+    cache = get_info_cache()
+    pending = []
+    for ticker in dict.fromkeys(tickers):
+        info = cache.get(ticker)
+        if info is None:
+            pending.append(ticker)
+        else:
+            yield ticker, info, None
+
+    if not pending:
+        return
+
+    workers = min(max_workers or config.INFO_MAX_WORKERS, len(pending))
+    if budget is not None:
+        timeout = budget.remaining()
+    else:
+        timeout = config.CALL_TIMEOUT * math.ceil(len(pending) / workers)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = {executor.submit(_fetch_and_cache, cache, ticker): ticker for ticker in pending}
+    finished = set()
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            ticker = futures[future]
+            finished.add(ticker)
+            try:
+                info = future.result()
+            except Exception as e:
+                yield ticker, cache.get(ticker, allow_stale=True) or {}, str(e)
+            else:
+                yield ticker, info, None
+    except TimeoutError:
+        for ticker in pending:
+            if ticker not in finished:
+                yield ticker, cache.get(ticker, allow_stale=True) or {}, "Timed out"
+    finally:
+        # Don't wait for hung lookups, they finish (and fill the cache) in the background
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,61 @@
+"""Conversion of price matrices into one currency."""
+import numpy as np
+import pandas as pd
+
+# Quote units some exchanges use instead of the ISO currency: code -> (currency, multiplier)
+MINOR_UNITS = {
+    "GBp": ("GBP", 0.01),
+    "GBX": ("GBP", 0.01),
+    "ILA": ("ILS", 0.01),
+    "ZAc": ("ZAR", 0.01),
+}
+
+
+def normalize_currency(code):
+    """(ISO currency, multiplier) for a provider currency code, e.g. "GBp" -> ("GBP", 0.01)."""
+    if code in MINOR_UNITS:
+        return MINOR_UNITS[code]
+    return code.upper(), 1.0
+
+
+def fx_symbol(currency, base):
+    """Provider symbol whose Close is the price of one ``currency`` in ``base``."""
+    return f"{currency}{base}=X"
+
+
+def fx_pairs(currencies, base):
+    """FX symbols needed to convert tickers quoted in ``currencies`` ({ticker: code}) to ``base``."""
+    pairs = {fx_symbol(normalize_currency(code)[0], base) for code in currencies.values()}
+    return sorted(pairs - {fx_symbol(base, base)})
+
+
+def needs_conversion(currencies, base):
+    return any(normalize_currency(code) != (base, 1.0) for code in currencies.values())
+
+
+def convert_prices(prices, currencies, rates, base):
+    """Convert every column of ``prices`` to ``base`` in a single broadcast multiply.
+
+    ``currencies`` maps each column to its quote currency (columns missing
+    from it are taken to be in ``base``); ``rates`` holds the Close of each
+    needed ``fx_symbol`` pair and is reindexed onto the prices' calendar,
+    carrying the last rate over FX holidays. Columns whose pair is missing
+    come back as NaN.
+    """
+    pairs = list(rates.columns)
+    rates = rates.reindex(prices.index.union(rates.index)).ffill().bfill().reindex(prices.index)
+    # After the pairs come a column of ones (already in ``base``) and one of NaN (no rates)
+    rate_values = np.hstack([rates.to_numpy(dtype="float64"), np.ones((len(prices), 1)),
+                             np.full((len(prices), 1), np.nan)])
+    columns, multipliers = [], []
+    for ticker in prices.columns:
+        currency, multiplier = normalize_currency(currencies.get(ticker) or base)
+        if currency == base:
+            columns.append(len(pairs))
+        else:
+            symbol = fx_symbol(currency, base)
+            columns.append(pairs.index(symbol) if symbol in pairs else len(pairs) + 1)
+        multipliers.append(multiplier)
+
+    values = prices.to_numpy(dtype="float64") * rate_values[:, columns] * np.array(multipliers)
+    return pd.DataFrame(values, index=prices.index, columns=prices.columns)
@@ -0,0 +1,204 @@
+"""Intraday (1- and 5-minute) bars held in fixed-size ring buffers.
+
+Each symbol keeps only its most recent bars in memory; bars that fall out
+of the window are spilled to the Parquet store in batches.
+"""
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from market_data import config
+from market_data.providers import get_provider
+from market_data.scheduler import get_scheduler
+from market_data.singleflight import SingleFlight
+from market_data.store import BarStore
+
+INTRADAY_INTERVALS = ("1m", "5m")
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class RingBuffer:
+    """The latest ``capacity`` bars as one contiguous, append-only window.
+
+    Bars are written into an array twice the capacity. When it fills up,
+    the newest ``capacity`` rows move to a fresh array and the rest go to
+    ``spill(times, values)``. Each append is amortized O(1), and ``view()``
+    is always a single slice. A view handed out is never overwritten by
+    later appends; only the last bar can change while it is still forming.
+    """
+
+    def __init__(self, capacity, columns=COLUMNS, spill=None):
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.spill = spill
+        self._times = np.empty(2 * capacity, dtype="int64")
+        self._values = np.full((2 * capacity, len(self.columns)), np.nan)
+        self._end = 0
+
+    def __len__(self):
+        return min(self._end, self.capacity)
+
+    @property
+    def last_time(self):
+        """Nanosecond UTC timestamp of the newest bar, or None when empty."""
+        return int(self._times[self._end - 1]) if self._end else None
+
+    def extend(self, times, values):
+        """Append bars with increasing ``times`` (int64 ns) after the current last bar."""
+        for i in range(0, len(times), self.capacity):
+            chunk_times, chunk_values = times[i:i + self.capacity], values[i:i + self.capacity]
+            if self._end + len(chunk_times) > len(self._times):
+                self._compact()
+            stop = self._end + len(chunk_times)
+            self._times[self._end:stop] = chunk_times
+            self._values[self._end:stop] = chunk_values
+            self._end = stop
+
+    def replace_last(self, values):
+        # The provider's newest bar keeps changing until its minute closes
+        self._values[self._end - 1] = values
+
+    def _compact(self):
+        keep_from = max(self._end - self.capacity, 0)
+        if self.spill is not None and keep_from:
+            self.spill(self._times[:keep_from], self._values[:keep_from])
+        # A new array, so views of the old one stay valid
+        times, values = np.empty_like(self._times), np.full_like(self._values, np.nan)
+        kept = self._end - keep_from
+        times[:kept] = self._times[keep_from:self._end]
+        values[:kept] = self._values[keep_from:self._end]
+        self._times, self._values, self._end = times, values, kept
+
+    def view(self):
+        """(times, values) of the window, as read-only views without copying."""
+        start = max(self._end - self.capacity, 0)
+        times, values = self._times[start:self._end], self._values[start:self._end]
+        times.flags.writeable = values.flags.writeable = False
+        return times, values
+
+
+def _to_utc_ns(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    return index.tz_convert("UTC").asi8
+
+
+class IntradayCache:
+    """One ``RingBuffer`` per (symbol, interval), topped up at most every ``ttl`` seconds.
+
+    An empty buffer is filled with the last ``lookback_days`` of bars; later
+    polls only ask for bars from the newest one onwards. Bars a buffer spills
+    are archived in the store after the cache lock is released.
+    """
+
+    def __init__(self, capacity, ttl, lookback_days, store=None):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.lookback_days = lookback_days
+        self._store = store
+        self._buffers = {}
+        self._polled = {}
+        self._timezones = {}
+        self._spilled = []
+        self._lock = threading.Lock()
+        self.flights = SingleFlight()
+
+    def _buffer(self, symbol, interval):
+        key = (symbol, interval)
+        with self._lock:
+            if key not in self._buffers:
+                spill = partial(self._spill, symbol, interval) if self._store is not None else None
+                self._buffers[key] = RingBuffer(self.capacity, spill=spill)
+            return self._buffers[key]
+
+    def _spill(self, symbol, interval, times, values):
+        # Called by the buffer with the cache lock held; written by _archive
+        self._spilled.append((symbol, interval, times, values))
+
+    def _archive(self):
+        with self._lock:
+            spilled, self._spilled = self._spilled, []
+        for symbol, interval, times, values in spilled:
+            frame = pd.DataFrame(values, index=pd.to_datetime(times, utc=True), columns=COLUMNS)
+            self._store.archive(symbol, interval, frame)
+
+    def get_bars(self, symbol, interval, budget=None):
+        """Return (read-only frame over the buffer's window, error) for one symbol.
+
+        The frame's values are a view of the buffer. The index is in the
+        exchange's time zone when the provider reports one. ``error`` is set
+        when the latest poll failed; the frame still holds whatever bars the
+        buffer already had.
+        """
+        if interval not in INTRADAY_INTERVALS:
+            raise ValueError(f"Unsupported intraday interval: {interval}")
+        buffer = self._buffer(symbol, interval)
+        error = None
+        if time.time() - self._polled.get((symbol, interval), 0) > self.ttl:
+            # Sessions polling the same symbol at once share one request
+            try:
+                error = self.flights.do((symbol, interval), lambda: self._poll(symbol, interval, budget),
+                                        timeout=budget.remaining() if budget is not None else None)
+            except TimeoutError:
+                error = "Fetch budget exceeded"
+
+        with self._lock:
+            times, values = buffer.view()
+            tz = self._timezones.get((symbol, interval), "UTC")
+        index = pd.to_datetime(times, utc=True).tz_convert(tz)
+        return pd.DataFrame(values, index=index, columns=COLUMNS, copy=False), error
+
+    def _poll(self, symbol, interval, budget):
+        buffer = self._buffer(symbol, interval)
+        now = pd.Timestamp.now(tz="UTC")
+        last = buffer.last_time
+        # The provider only serves the last few days of minute bars, so a buffer
+        # left alone for longer restarts from the lookback window
+        start = now - pd.Timedelta(days=self.lookback_days[interval])
+        if last is not None:
+            start = max(start, pd.Timestamp(last, tz="UTC"))
+        [result] = get_scheduler().fetch([([symbol], start, now + pd.Timedelta(minutes=1), interval)],
+                                         budget=budget)
+        if result.error is not None:
+            return result.error
+
+        frame = result.frame.reindex(columns=COLUMNS)
+        times = _to_utc_ns(frame.index)
+        values = frame.to_numpy(dtype="float64")
+        with self._lock:
+            if frame.index.tz is not None:
+                self._timezones[(symbol, interval)] = frame.index.tz
+            if last is not None and len(times) and times[0] == last:
+                buffer.replace_last(values[0])
+            new = times > (last if last is not None else -1)
+            buffer.extend(times[new], values[new])
+            self._polled[(symbol, interval)] = time.time()
+        if self._store is not None:
+            self._archive()
+        return None
+
+
+@st.cache_resource
+def get_intraday_cache():
+    store = BarStore(Path(config.STORE_DIR) / get_provider().name) if config.STORE_DIR else None
+    return IntradayCache(config.INTRADAY_CAPACITY, config.INTRADAY_TTL,
+                         {"1m": config.INTRADAY_LOOKBACK_1M, "5m": config.INTRADAY_LOOKBACK_5M}, store)
+
+
+def get_intraday_bars(ticker, interval="5m", budget=None):
+    """Return (latest intraday bars of one ticker, error of the latest poll or None).
+
+    When the poll failed the bars may be out of date. Raises ValueError if
+    there are none.
+    """
+    bars, error = get_intraday_cache().get_bars(ticker, interval, budget)
+    if bars.empty:
+        raise ValueError(f"No intraday data for {ticker}: {error or 'No data returned'}")
+    return bars, error
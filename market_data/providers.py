@@ -0,0 +1,225 @@
+"""Market data providers: where price history and company info come from."""
+import hashlib
+import json
+import pickle
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+import yfinance as yf
+from yfinance import shared
+
+from market_data import config
+from market_data.files import write_atomic
+
+
+class MarketDataProvider:
+    """Interface every data source implements.
+
+    ``history`` returns a DataFrame with (ticker, field) columns plus a
+    {ticker: error} dict for symbols without data; ``info`` returns the
+    company info dict for one ticker.
+
+    Providers that can't serve two ``history`` calls at once set ``serial``;
+    the fetch scheduler then runs their calls one at a time per process.
+    """
+
+    name = "base"
+    serial = False
+
+    def history(self, tickers, start_date, end_date, interval="1d"):
+        raise NotImplementedError
+
+    def info(self, ticker):
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance."""
+
+    name = "yfinance"
+    # yf.download keeps its results in module-level state, so two sessions
+    # downloading at the same time would overwrite each other's frames
+    serial = True
+
+    def history(self, tickers, start_date, end_date, interval="1d"):
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return pd.DataFrame(), {}
+
+        # Close stays unadjusted for dividends, which come back as their own
+        # column so total returns can be derived from them
+        raw = yf.download(
+            tickers,
+            start=start_date,
+            end=end_date,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=False,
+            actions=True,
+            threads=True,
+            progress=False,
+        )
+        errors = dict(getattr(shared, "_ERRORS", {}))
+
+        # A single ticker comes back with flat columns
+        if not isinstance(raw.columns, pd.MultiIndex):
+            raw = pd.concat({tickers[0]: raw}, axis=1)
+
+        failures = {}
+        for ticker in tickers:
+            if ticker not in raw.columns.get_level_values(0):
+                failures[ticker] = errors.get(ticker.upper(), "No data returned")
+            elif raw[ticker].dropna(how="all").empty:
+                failures[ticker] = errors.get(ticker.upper(), "No data returned")
+
+        raw = raw.drop(columns=list(failures), level=0, errors="ignore")
+        raw = raw.drop(columns="Adj Close", level=1, errors="ignore")
+        return raw, failures
+
+    def info(self, ticker):
+        return yf.Ticker(ticker).info
+
+
+class LocalFileProvider(MarketDataProvider):
+    """Reads price dumps from a directory, for offline or air-gapped use.
+
+    Bars are read from ``<root>/<interval>/<SYMBOL>.parquet`` or ``.csv``
+    (falling back to ``<root>/<SYMBOL>.*`` for daily data) with a date index
+    and at least a ``Close`` column. Company info is read from
+    ``<root>/info/<SYMBOL>.json``.
+    """
+
+    name = "local"
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _find(self, symbol, interval):
+        folders = [self.root / interval] + ([self.root] if interval == "1d" else [])
+        for folder in folders:
+            for suffix in (".parquet", ".csv"):
+                path = folder / f"{symbol}{suffix}"
+                if path.exists():
+                    return path
+        return None
+
+    def _read(self, path):
+        if path.suffix == ".parquet":
+            frame = pd.read_parquet(path)
+        else:
+            frame = pd.read_csv(path, index_col=0)
+        index = pd.to_datetime(frame.index)
+        if not isinstance(index, pd.DatetimeIndex):
+            # Mixed UTC offsets (e.g. across DST): keep each row's local wall time
+            index = pd.DatetimeIndex([pd.Timestamp(value).tz_localize(None) for value in frame.index])
+        elif index.tz is not None:
+            index = index.tz_localize(None)
+        frame.index = index
+        return frame.sort_index()
+
+    def history(self, tickers, start_date, end_date, interval="1d"):
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        # Files hold naive timestamps; intraday requests come in as UTC
+        if start.tz is not None:
+            start, end = start.tz_convert(None), end.tz_convert(None)
+        frames, failures = {}, {}
+        for ticker in dict.fromkeys(tickers):
+            path = self._find(ticker, interval)
+            if path is None:
+                failures[ticker] = f"No file for {ticker} in {self.root}"
+                continue
+            frame = self._read(path)
+            frame = frame.loc[(frame.index >= start) & (frame.index < end)]
+            if frame.empty:
+                failures[ticker] = "No data in the requested range"
+            else:
+                frames[ticker] = frame
+        if not frames:
+            return pd.DataFrame(), failures
+        return pd.concat(frames, axis=1), failures
+
+    def info(self, ticker):
+        path = self.root / "info" / f"{ticker}.json"
+        if not path.exists():
+            raise ValueError(f"No info file for {ticker} in {self.root}")
+        return json.loads(path.read_text())
+
+
+def _recording_path(root, method, *args):
+    # Requests are keyed on their normalized arguments, e.g. the ticker batch and date range
+    key = json.dumps([method] + [_normalize_arg(arg) for arg in args])
+    return Path(root) / f"{method}-{hashlib.sha1(key.encode()).hexdigest()}.pkl"
+
+
+def _normalize_arg(arg):
+    if isinstance(arg, (list, tuple)):
+        return [_normalize_arg(a) for a in arg]
+    if isinstance(arg, str):
+        return arg
+    return pd.Timestamp(arg).isoformat()
+
+
+class RecordingProvider(MarketDataProvider):
+    """Wraps another provider and pickles every response to ``root``."""
+
+    def __init__(self, inner, root):
+        self.inner = inner
+        self.root = Path(root)
+        self.name = inner.name
+        self.serial = inner.serial
+
+    def _save(self, path, result):
+        write_atomic(path, lambda tmp_path: tmp_path.write_bytes(pickle.dumps(result)))
+
+    def history(self, tickers, start_date, end_date, interval="1d"):
+        result = self.inner.history(tickers, start_date, end_date, interval)
+        self._save(_recording_path(self.root, "history", list(tickers), start_date, end_date, interval), result)
+        return result
+
+    def info(self, ticker):
+        result = self.inner.info(ticker)
+        self._save(_recording_path(self.root, "info", ticker), result)
+        return result
+
+
+class ReplayProvider(MarketDataProvider):
+    """Serves responses captured by ``RecordingProvider`` without any network access.
+
+    A request that was never recorded raises ``LookupError`` so a benchmark
+    run can't silently diverge from the recording.
+    """
+
+    name = "replay"
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _load(self, path):
+        if not path.exists():
+            raise LookupError(f"No recorded response at {path}")
+        return pickle.loads(path.read_bytes())
+
+    def history(self, tickers, start_date, end_date, interval="1d"):
+        return self._load(_recording_path(self.root, "history", list(tickers), start_date, end_date, interval))
+
+    def info(self, ticker):
+        return self._load(_recording_path(self.root, "info", ticker))
+
+
+@lru_cache(maxsize=None)
+def get_provider():
+    """The provider selected by ``MARKET_DATA_PROVIDER`` and ``MARKET_DATA_RECORD_MODE``."""
+    if config.RECORD_MODE == "replay":
+        return ReplayProvider(config.RECORD_DIR)
+
+    if config.PROVIDER == "yfinance":
+        provider = YFinanceProvider()
+    elif config.PROVIDER == "local":
+        provider = LocalFileProvider(config.LOCAL_DATA_DIR)
+    else:
+        raise ValueError(f"Unknown market data provider: {config.PROVIDER!r}")
+
+    if config.RECORD_MODE == "record":
+        return RecordingProvider(provider, config.RECORD_DIR)
+    return provider
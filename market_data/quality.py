@@ -0,0 +1,164 @@
+"""Vectorized cleaning of fetched OHLCV bars.
+
+Runs once when a series enters the price cache, so pages compute returns
+from validated data instead of re-checking it on every rerun.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+
+# Price ratios between two sessions that look like a split the provider didn't adjust for;
+# only corrected when the provider's Stock Splits column reports a split that session
+SPLIT_RATIOS = np.array([2, 3, 4, 5, 8, 10, 15, 20, 25, 30, 40, 50, 100], dtype="float64")
+SPLIT_TOLERANCE = 0.02
+
+# Missing sessions carried forward (or, when absent from the index, assumed to
+# be exchange holidays); longer runs are left as gaps and reported
+MAX_FILL = 3
+
+# Robust z-score (median/MAD of log returns) above which a return is flagged
+OUTLIER_Z = 10.0
+
+
+@dataclass
+class QualityReport:
+    """What ``clean_bars`` found and changed in one series."""
+
+    rows: int = 0
+    duplicates: int = 0
+    invalid_prices: int = 0
+    filled: int = 0
+    long_gaps: list = field(default_factory=list)  # (first, last) missing session
+    splits: list = field(default_factory=list)  # (session, price ratio) corrected
+    outliers: list = field(default_factory=list)  # sessions with an extreme return
+
+    @property
+    def clean(self):
+        return not (self.duplicates or self.invalid_prices or self.filled or self.long_gaps
+                    or self.splits or self.outliers)
+
+    def summary(self):
+        parts = []
+        if self.duplicates:
+            parts.append(f"{self.duplicates} duplicate rows dropped")
+        if self.invalid_prices:
+            parts.append(f"{self.invalid_prices} rows with zero or negative prices")
+        if self.filled:
+            parts.append(f"{self.filled} missing sessions carried forward")
+        if self.long_gaps:
+            parts.append(f"{len(self.long_gaps)} gaps longer than {MAX_FILL} sessions")
+        if self.splits:
+            parts.append("unadjusted splits corrected on "
+                         + ", ".join(f"{day:%Y-%m-%d}" for day, _ in self.splits))
+        if self.outliers:
+            parts.append("outlier returns on " + ", ".join(f"{day:%Y-%m-%d}" for day in self.outliers))
+        return "; ".join(parts)
+
+
+def _runs(mask):
+    # (start, stop) row positions of each run of True in ``mask``
+    edges = np.diff(np.concatenate([[0], mask.astype("int8"), [0]]))
+    return zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))
+
+
+def clean_bars(frame, max_fill=MAX_FILL, z_threshold=OUTLIER_Z, freq=None):
+    """Return (cleaned copy of ``frame``, QualityReport).
+
+    Duplicate timestamps keep their last row, zero or negative prices
+    become missing, runs of up to ``max_fill`` missing closes are carried
+    forward (longer ones are reported and left empty), jumps matching a
+    split ratio on a session the provider reports a split are adjusted out
+    of the earlier history, and extreme returns are reported but kept.
+
+    With ``freq`` (e.g. "B" for daily bars) sessions absent from the index
+    are found too: runs longer than ``max_fill`` are reported as gaps,
+    shorter ones are taken to be exchange holidays.
+    """
+    report = QualityReport(rows=len(frame))
+    duplicated = frame.index.duplicated(keep="last")
+    report.duplicates = int(duplicated.sum())
+    if report.duplicates:
+        frame = frame[~duplicated]
+    if not frame.index.is_monotonic_increasing:
+        frame = frame.sort_index()
+    columns = [c for c in PRICE_COLUMNS if c in frame.columns]
+    if frame.empty or not columns:
+        return frame, report
+
+    if freq is not None:
+        sessions = frame.index.normalize()
+        expected = pd.date_range(sessions[0], sessions[-1], freq=freq)
+        for start, stop in _runs(~expected.isin(sessions)):
+            if stop - start > max_fill:
+                report.long_gaps.append((expected[start], expected[stop - 1]))
+
+    values = frame[columns].to_numpy(dtype="float64", copy=True)
+    invalid = values <= 0
+    report.invalid_prices = int(invalid.any(axis=1).sum())
+    values[invalid] = np.nan
+
+    close = columns.index("Close") if "Close" in columns else len(columns) - 1
+    missing = np.isnan(values[:, close])
+    if missing.any():
+        # Rows of a missing run share the position of the last valid row before it
+        last_valid = np.maximum.accumulate(np.where(missing, -1, np.arange(len(values))))
+        run_length = np.zeros(len(values), dtype="int64")
+        for start, stop in _runs(missing):
+            run_length[start:stop] = stop - start
+            if stop - start > max_fill or start == 0:
+                report.long_gaps.append((frame.index[start], frame.index[stop - 1]))
+        fill = missing & (run_length <= max_fill) & (last_valid >= 0)
+        values[fill] = values[last_valid[fill]]
+        report.filled = int(fill.sum())
+        report.long_gaps.sort()
+
+    volume = frame["Volume"].to_numpy(dtype="float64", copy=True) if "Volume" in frame.columns else None
+    dividends = frame["Dividends"].to_numpy(dtype="float64", copy=True) if "Dividends" in frame.columns else None
+    closes = values[:, close]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = closes[1:] / closes[:-1]
+        jump = np.where(ratio < 1, 1 / ratio, ratio)
+        nearest = SPLIT_RATIOS[np.abs(SPLIT_RATIOS[None, :] - jump[:, None]).argmin(axis=1)]
+        split_like = np.abs(jump / nearest - 1) < SPLIT_TOLERANCE
+    # A real -50% (or +100%) day looks the same, so only sessions the provider
+    # reports a split on are corrected; other split-like jumps are outliers
+    if "Stock Splits" in frame.columns:
+        is_split = split_like & (np.nan_to_num(frame["Stock Splits"].to_numpy(dtype="float64")[1:]) > 0)
+    else:
+        is_split = np.zeros_like(split_like)
+    if is_split.any():
+        # Scale every row before a split by the ratios of all later splits
+        factor = np.ones(len(values))
+        factor[1:][is_split] = np.where(ratio < 1, 1 / nearest, nearest)[is_split]
+        later = np.append(np.cumprod(factor[::-1])[::-1][1:], 1.0)
+        values *= later[:, None]
+        if volume is not None:
+            volume /= later
+        if dividends is not None:
+            dividends *= later
+        report.splits = [(frame.index[i + 1], float(factor[i + 1])) for i in np.flatnonzero(is_split)]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_returns = np.diff(np.log(values[:, close]))
+    if np.isfinite(log_returns).sum() > 2:
+        median = np.nanmedian(log_returns)
+        mad = 1.4826 * np.nanmedian(np.abs(log_returns - median))
+        if mad > 0:
+            z = np.abs(log_returns - median) / mad
+            report.outliers = list(frame.index[1:][np.nan_to_num(z) > z_threshold])
+    unconfirmed = frame.index[1:][split_like & ~is_split]
+    if len(unconfirmed):
+        report.outliers = sorted(set(report.outliers) | set(unconfirmed))
+
+    if report.clean:
+        return frame, report
+    frame = frame.copy()
+    frame[columns] = values
+    if volume is not None and report.splits:
+        frame["Volume"] = volume
+    if dividends is not None and report.splits:
+        frame["Dividends"] = dividends
+    return frame, report
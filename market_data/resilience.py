@@ -0,0 +1,82 @@
+"""Latency bounds for provider calls: per-page fetch budgets and a circuit breaker."""
+import threading
+import time
+from functools import lru_cache
+
+from market_data import config
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the breaker is open."""
+
+
+class FetchBudget:
+    """Total time a page may spend waiting on the provider."""
+
+    def __init__(self, seconds):
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self):
+        return self.remaining() == 0
+
+
+class CircuitBreaker:
+    """Stops calling a failing provider for ``cooldown`` seconds.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    ``allow`` returns False, so callers fall back to cached data. Once the
+    cooldown has passed a single trial call is let through (half-open); its
+    outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=60):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return "open"
+            return "half-open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def check(self):
+        if not self.allow():
+            raise CircuitOpenError("Data provider unavailable, serving cached data")
+
+
+@lru_cache(maxsize=None)
+def get_breaker():
+    """Breaker shared by all price and info calls to the configured provider."""
+    return CircuitBreaker(config.BREAKER_THRESHOLD, config.BREAKER_COOLDOWN)
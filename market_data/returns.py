@@ -0,0 +1,46 @@
+"""Aggregations over returns matrices that need full precision.
+
+Shared matrices may be stored as float32 (``MARKET_DATA_COMPACT=1``); these
+helpers upcast before accumulating so long compounding chains and
+covariances keep float64 accuracy.
+"""
+import numpy as np
+import pandas as pd
+
+# Return bases the analysis pages offer: label -> price matrix field
+RETURN_FIELDS = {"Total Return": "Total Return", "Price Return": "Close"}
+
+
+def compound_returns(returns):
+    """Growth of 1 invested at the start: ``(1 + returns).cumprod()`` in float64."""
+    return (1 + returns.astype("float64")).cumprod()
+
+
+def total_return_index(close, dividends=None):
+    """Close with every dividend reinvested at its ex-date close, in float64.
+
+    Starts at the first close; each ex-date scales the rest of the series by
+    ``1 + dividend / close``, applied as one cumulative product.
+    """
+    close = close.astype("float64")
+    if dividends is None or close.empty:
+        return close
+    yields = (dividends.astype("float64") / close).fillna(0)
+    growth = (1 + yields).cumprod()
+    return close * growth / growth.iloc[0]
+
+
+def covariance(returns):
+    """Pairwise covariance of a returns frame, accumulated in float64."""
+    return returns.astype("float64").cov()
+
+
+def weighted_returns(returns, weights):
+    """Daily returns of a portfolio holding ``weights`` ({ticker: weight}) of ``returns``.
+
+    Tickers without a returns column are skipped; computed as one float64
+    matrix-vector product instead of a Series per holding.
+    """
+    tickers = [ticker for ticker in weights if ticker in returns.columns]
+    w = np.array([weights[ticker] for ticker in tickers], dtype="float64")
+    return pd.Series(returns[tickers].to_numpy(dtype="float64") @ w, index=returns.index)
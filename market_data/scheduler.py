@@ -0,0 +1,241 @@
+"""Asyncio fetch pipeline with a shared rate limit, bounded concurrency and retries."""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import NamedTuple
+
+import pandas as pd
+
+from market_data import config
+from market_data.providers import get_provider
+from market_data.resilience import CircuitOpenError, get_breaker
+
+# Provider errors worth retrying; anything else (e.g. an unknown symbol) fails at once
+_TRANSIENT_MARKERS = ("rate limit", "too many requests", "429", "timed out", "timeout",
+                      "connection", "provider unavailable", "budget exceeded")
+
+
+def is_transient(error):
+    error = str(error).lower()
+    return any(marker in error for marker in _TRANSIENT_MARKERS)
+
+
+class FetchResult(NamedTuple):
+    ticker: str
+    start: pd.Timestamp
+    end: pd.Timestamp
+    frame: pd.DataFrame
+    error: str
+
+
+class TokenBucket:
+    """Rate limiter shared by every session in the process.
+
+    Holds up to ``capacity`` tokens that refill at ``rate`` per second; each
+    provider request takes one. The state is guarded by a thread lock since
+    every session runs its own event loop.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        # Returns 0 when a token was taken, otherwise the seconds to wait for one
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        while (wait := self._take()) > 0:
+            await asyncio.sleep(wait)
+
+
+class FetchScheduler:
+    """Runs batched history requests concurrently on an event loop.
+
+    Each request is split into batches of at most ``batch_size`` tickers, at
+    most ``max_concurrency`` batches are in flight at once, and every
+    provider call first takes a token from the shared bucket. Symbols that
+    fail with a transient error are retried on their own with jittered
+    exponential backoff.
+
+    Every call is bounded by ``call_timeout`` and reported to the circuit
+    breaker; while the breaker is open no calls are made at all. Calls to a
+    ``serial`` provider run one at a time per process, and the timeout only
+    starts once a call actually reaches the provider, so waiting in line
+    never counts as a provider failure.
+    """
+
+    def __init__(self, bucket, breaker, max_concurrency=4, batch_size=20, max_retries=3,
+                 base_delay=1.0, call_timeout=20.0):
+        self.bucket = bucket
+        self.breaker = breaker
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.call_timeout = call_timeout
+        # Provider calls run on a pool of our own: asyncio.run() waits for its
+        # default executor on exit, which would undo the call timeouts
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency * 2,
+                                            thread_name_prefix="provider-call")
+        self._serial_lock = threading.Lock()
+        self._serial_deadline = None
+
+    def fetch(self, requests, on_result=None, budget=None):
+        """Fetch ``requests`` given as (tickers, start, end, interval) tuples.
+
+        Returns a list of FetchResult, one per ticker and request.
+        ``on_result`` is called with each result as soon as it arrives, on
+        the calling thread. Tickers still pending when the ``FetchBudget``
+        runs out are returned as failures.
+        """
+        return asyncio.run(self._run(requests, on_result, budget))
+
+    async def _run(self, requests, on_result, budget):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results, done = [], set()
+
+        def emit(result):
+            done.add((result.ticker, result.start))
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+        batches = [
+            (tickers[i:i + self.batch_size], start, end, interval)
+            for tickers, start, end, interval in requests
+            for i in range(0, len(tickers), self.batch_size)
+        ]
+        work = asyncio.gather(*(self._fetch_batch(semaphore, emit, *batch) for batch in batches))
+        try:
+            await asyncio.wait_for(work, timeout=budget.remaining() if budget else None)
+        except asyncio.TimeoutError:
+            for tickers, start, end, _ in batches:
+                for ticker in tickers:
+                    if (ticker, start) not in done:
+                        emit(FetchResult(ticker, start, end, None, "Fetch budget exceeded"))
+        return results
+
+    def _acquire_serial(self):
+        # Waits for the running call, but not past its own timeout: behind a
+        # hung call nothing would ever get through
+        while not self._serial_lock.acquire(timeout=0.05):
+            deadline = self._serial_deadline
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+        self._serial_deadline = time.monotonic() + self.call_timeout
+        return True
+
+    def _release_serial(self):
+        self._serial_deadline = None
+        self._serial_lock.release()
+
+    async def _call(self, semaphore, tickers, start, end, interval):
+        async with semaphore:
+            await self.bucket.acquire()
+            loop = asyncio.get_running_loop()
+            started, abandoned, recorded = asyncio.Event(), threading.Event(), threading.Lock()
+            provider = get_provider()
+
+            def record(success):
+                # Once per call, by whichever of the worker and the timeout comes first
+                if recorded.acquire(blocking=False):
+                    self.breaker.record_success() if success else self.breaker.record_failure()
+
+            def run():
+                # The outcome is recorded here, so it still reaches the breaker
+                # (and ends a half-open trial) after the caller has given up
+                if provider.serial and not self._acquire_serial():
+                    record(False)
+                    raise TimeoutError("Provider busy with a call that timed out")
+                try:
+                    # Dropped while waiting in line (e.g. the page budget ran out)
+                    if abandoned.is_set():
+                        return None
+                    self.breaker.check()
+                    try:
+                        loop.call_soon_threadsafe(started.set)
+                    except RuntimeError:
+                        pass  # The caller's event loop is already gone
+                    try:
+                        raw, failures = provider.history(tickers, start, end, interval)
+                    except Exception:
+                        record(False)
+                        raise
+                    # A batch where every symbol hit a transient error counts as a provider failure
+                    record(not (failures and len(failures) == len(tickers)
+                                and all(map(is_transient, failures.values()))))
+                    return raw, failures
+                finally:
+                    if provider.serial:
+                        self._release_serial()
+
+            call = loop.run_in_executor(self._executor, run)
+            waiting = asyncio.ensure_future(started.wait())
+            try:
+                # The timeout only starts once the call reaches the provider
+                await asyncio.wait({call, waiting}, return_when=asyncio.FIRST_COMPLETED)
+                if not call.done():
+                    await asyncio.wait({call}, timeout=self.call_timeout)
+            except asyncio.CancelledError:
+                abandoned.set()
+                raise
+            finally:
+                waiting.cancel()
+            if not call.done():
+                record(False)
+                raise TimeoutError(f"Provider call timed out after {self.call_timeout:.0f}s")
+            return call.result()
+
+    async def _fetch_batch(self, semaphore, emit, tickers, start, end, interval):
+        pending, attempt = list(tickers), 0
+        while pending:
+            try:
+                raw, failures = await self._call(semaphore, pending, start, end, interval)
+                retryable = {t for t, error in failures.items() if is_transient(error)}
+            except CircuitOpenError as e:
+                raw, failures, retryable = None, {t: str(e) for t in pending}, set()
+            except Exception as e:
+                # A failed request says nothing about the symbols, so retry them all
+                raw, failures = None, {t: str(e) for t in pending}
+                retryable = set(pending)
+
+            retry = []
+            for ticker in pending:
+                if ticker not in failures:
+                    emit(FetchResult(ticker, start, end, raw[ticker].dropna(how="all"), None))
+                elif ticker in retryable and attempt < self.max_retries:
+                    retry.append(ticker)
+                else:
+                    emit(FetchResult(ticker, start, end, None, failures[ticker]))
+
+            if retry:
+                await asyncio.sleep(self.base_delay * 2 ** attempt * random.uniform(0.5, 1.5))
+                attempt += 1
+            pending = retry
+
+
+@lru_cache(maxsize=None)
+def get_scheduler():
+    bucket = TokenBucket(config.FETCH_RATE, config.FETCH_BURST)
+    return FetchScheduler(
+        bucket,
+        get_breaker(),
+        max_concurrency=config.FETCH_CONCURRENCY,
+        batch_size=config.FETCH_BATCH_SIZE,
+        max_retries=config.FETCH_RETRIES,
+        call_timeout=config.CALL_TIMEOUT,
+    )
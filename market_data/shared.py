@@ -0,0 +1,102 @@
+"""SQLite table shared by every server process on the host.
+
+Replicas behind a load balancer each keep their own in-memory caches; this
+file lets them hand each other company info, record when a price series
+was last refreshed, and agree on which process downloads a series so the
+others wait for its result instead of repeating the request.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+from market_data import config
+from market_data.providers import get_provider
+
+
+class SharedCache:
+    """Pickled values with their store time, plus expiring leases.
+
+    Values carry no TTL of their own; readers pass the maximum age they
+    accept. A lease is held by one process (and thread) at a time and
+    lapses after ``lease_ttl`` seconds in case its holder died.
+    """
+
+    def __init__(self, path, lease_ttl=120):
+        self.path = Path(path)
+        self.lease_ttl = lease_ttl
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS entries (namespace TEXT, key TEXT, value BLOB,"
+                       " stored_at REAL, PRIMARY KEY (namespace, key))")
+            db.execute("CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT,"
+                       " expires REAL)")
+
+    def _connect(self):
+        # sqlite3 connections can't be shared between threads
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, namespace, key, max_age=None):
+        """Return (value, stored_at), or None if missing or older than ``max_age`` seconds."""
+        row = self._connect().execute(
+            "SELECT value, stored_at FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return pickle.loads(row[0]), row[1]
+
+    def put(self, namespace, key, value):
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                       (namespace, key, pickle.dumps(value), time.time()))
+
+    def _lease_owner(self):
+        return f"{self.owner}-{threading.get_ident()}"
+
+    def acquire(self, name):
+        """Take the lease ``name`` if nobody else holds it; returns whether it was taken."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute("DELETE FROM leases WHERE name = ? AND expires < ?", (name, now))
+            cursor = db.execute("INSERT OR IGNORE INTO leases VALUES (?, ?, ?)",
+                                (name, self._lease_owner(), now + self.lease_ttl))
+        return cursor.rowcount == 1
+
+    def release(self, name):
+        with self._connect() as db:
+            db.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, self._lease_owner()))
+
+    def wait(self, names, timeout, poll=0.25):
+        """Block until none of ``names`` is leased or ``timeout`` seconds pass."""
+        deadline = time.monotonic() + timeout
+        names = list(names)
+        while names and time.monotonic() < deadline:
+            time.sleep(poll)
+            placeholders = ", ".join("?" * len(names))
+            held = self._connect().execute(
+                f"SELECT name FROM leases WHERE name IN ({placeholders}) AND expires >= ?",
+                (*names, time.time()),
+            ).fetchall()
+            names = [name for (name,) in held]
+        return not names
+
+
+@lru_cache(maxsize=None)
+def get_shared_cache():
+    """The host-wide cache for the active provider, or None when disabled."""
+    if not (config.SHARED_CACHE and config.STORE_DIR):
+        return None
+    return SharedCache(Path(config.STORE_DIR) / get_provider().name / "shared.sqlite",
+                       lease_ttl=config.LEASE_TTL)
@@ -0,0 +1,82 @@
+"""Request coalescing: concurrent callers for the same key share one fetch."""
+import threading
+
+
+class Call:
+    """An in-flight fetch that followers can wait on."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def resolve(self, result=None, error=None):
+        self.result, self.error = result, error
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """The leader's result; raises TimeoutError if it hasn't arrived within ``timeout`` seconds."""
+        if not self._done.wait(timeout):
+            raise TimeoutError("Timed out waiting for an in-flight fetch")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Tracks in-flight keys so that only the first caller (the leader) does
+    the work while later callers for the same key wait for its result."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.requested = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    def acquire(self, keys):
+        """Split ``keys`` into ({key: Call} this caller must resolve, {key: Call} to wait on)."""
+        leading, following = {}, {}
+        with self._lock:
+            for key in keys:
+                self.requested += 1
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = Call()
+                    leading[key] = call
+                    self.executed += 1
+                else:
+                    following[key] = call
+                    self.coalesced += 1
+        return leading, following
+
+    def release(self, key, result=None, error=None):
+        """Publish the leader's result for ``key`` and wake its followers."""
+        with self._lock:
+            call = self._calls.pop(key)
+        call.resolve(result, error)
+
+    def do(self, key, fn, timeout=None):
+        """Run ``fn`` once for all concurrent callers of ``key``.
+
+        Followers wait at most ``timeout`` seconds for the leader (see ``Call.wait``).
+        """
+        leading, following = self.acquire([key])
+        if following:
+            return following[key].wait(timeout)
+        try:
+            result = fn()
+        except Exception as e:
+            self.release(key, error=e)
+            raise
+        self.release(key, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requested": self.requested,
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
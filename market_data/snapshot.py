@@ -0,0 +1,178 @@
+"""Columnar snapshot of key company info fields, refreshed on a TTL.
+
+Pages look companies up here (a dict lookup) instead of calling the
+provider per click; the cache warmer keeps the universe current and pages
+fetch only portfolio tickers that are missing or expired.
+"""
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from market_data import config
+from market_data.files import write_atomic
+from market_data.fundamentals import iter_info
+from market_data.providers import get_provider
+from market_data.scheduler import is_transient
+
+# Snapshot column -> provider info key
+FIELDS = {
+    "name": "longName",
+    "sector": "sector",
+    "industry": "industry",
+    "market_cap": "marketCap",
+    "price": "currentPrice",
+    "low_52w": "fiftyTwoWeekLow",
+    "high_52w": "fiftyTwoWeekHigh",
+    "currency": "currency",
+}
+
+
+def has_company_info(symbol):
+    """False for symbols the provider has no company info for: indices and FX pairs."""
+    return not symbol.startswith("^") and not symbol.endswith("=X")
+
+
+class FundamentalsSnapshot:
+    """{symbol: row} of ``FIELDS`` plus the time each row was fetched.
+
+    Rows are kept in memory for lookups and written to a Parquet file at
+    ``path`` (if given) so they survive restarts and are shared with other
+    server processes, which reload the file when it changes.
+
+    Symbols whose lookup failed for good (e.g. an unknown ticker) are not
+    asked for again until ``ttl`` has passed.
+    """
+
+    def __init__(self, path=None, ttl=None):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self._rows = {}
+        self._failed = {}
+        self._mtime = None
+        # Reentrant: writes reload the file under the same lock
+        self._lock = threading.RLock()
+        self._reload()
+
+    def _reload(self):
+        if self.path is None or not self.path.exists():
+            return
+        mtime = self.path.stat().st_mtime
+        if mtime == self._mtime:
+            return
+        frame = pd.read_parquet(self.path)
+        rows = {symbol: {k: (None if pd.isna(v) else v) for k, v in row.items()}
+                for symbol, row in frame.to_dict("index").items()}
+        with self._lock:
+            # Keep whichever of the file's and our own row was fetched last
+            for symbol, row in rows.items():
+                current = self._rows.get(symbol)
+                if current is None or row["fetched_at"] >= current["fetched_at"]:
+                    self._rows[symbol] = row
+            self._mtime = mtime
+
+    def get(self, symbol, allow_stale=True):
+        """The row for ``symbol`` as a dict, or None if unknown (or expired and not ``allow_stale``)."""
+        self._reload()
+        row = self._rows.get(symbol)
+        if row is None or (not allow_stale and self._expired(row)):
+            return None
+        return row
+
+    def frame(self, symbols=None):
+        """Rows as a DataFrame indexed by symbol, for grouping and weighting."""
+        self._reload()
+        with self._lock:
+            rows = dict(self._rows)
+        if symbols is not None:
+            rows = {s: rows[s] for s in symbols if s in rows}
+        return pd.DataFrame.from_dict(rows, orient="index", columns=[*FIELDS, "fetched_at"])
+
+    def _expired(self, row):
+        return self.ttl is not None and time.time() - row["fetched_at"] > self.ttl
+
+    def stale(self, symbols):
+        """Symbols without a row or whose row is older than ``ttl``, except recent failures."""
+        self._reload()
+        return [s for s in dict.fromkeys(symbols)
+                if self.get(s, allow_stale=False) is None and not self._failed_recently(s)]
+
+    def _failed_recently(self, symbol):
+        failed_at = self._failed.get(symbol)
+        return failed_at is not None and (self.ttl is None or time.time() - failed_at <= self.ttl)
+
+    def _record_failure(self, symbol, error):
+        # Transient errors (timeouts, rate limits, open breaker) are retried on the next call
+        if not is_transient(error):
+            with self._lock:
+                self._failed[symbol] = time.time()
+
+    def put(self, infos, write=True):
+        """Store {symbol: provider info dict} and persist the snapshot.
+
+        ``write=False`` only updates memory; a later ``flush`` persists it.
+        """
+        now = time.time()
+        rows = {symbol: {**{field: info.get(key) for field, key in FIELDS.items()}, "fetched_at": now}
+                for symbol, info in infos.items()}
+        with self._lock:
+            self._rows.update(rows)
+        if write:
+            self.flush()
+
+    def flush(self):
+        """Write the snapshot file, keeping rows other processes wrote since we last read it."""
+        if self.path is None:
+            return
+        with self._lock:
+            self._reload()
+            self._write()
+
+    def _write(self):
+        frame = pd.DataFrame.from_dict(self._rows, orient="index", columns=[*FIELDS, "fetched_at"])
+        write_atomic(self.path, lambda tmp_path: frame.to_parquet(tmp_path, compression="zstd"))
+        self._mtime = self.path.stat().st_mtime
+
+    def iter_rows(self, symbols, budget=None):
+        """Yield (symbol, row, error) like ``iter_info``, fetching only stale symbols.
+
+        A failed fetch yields the expired row, if any, together with the error.
+        """
+        stale = self.stale(symbols)
+        for symbol in dict.fromkeys(symbols):
+            if symbol not in stale:
+                yield symbol, self.get(symbol), None
+        fetched = False
+        try:
+            for symbol, info, error in iter_info(stale, budget=budget):
+                if error is None:
+                    # Persisted once at the end rather than rewriting the file per symbol
+                    self.put({symbol: info}, write=False)
+                    fetched = True
+                else:
+                    self._record_failure(symbol, error)
+                yield symbol, self.get(symbol), error
+        finally:
+            if fetched:
+                self.flush()
+
+    def refresh(self, symbols, budget=None):
+        """Fetch every stale symbol and persist them in one write; returns {symbol: error}."""
+        infos, failures = {}, {}
+        for symbol, info, error in iter_info(self.stale(symbols), budget=budget):
+            if error is None:
+                infos[symbol] = info
+            else:
+                failures[symbol] = error
+                self._record_failure(symbol, error)
+        if infos:
+            self.put(infos)
+        return failures
+
+
+@st.cache_resource
+def get_snapshot():
+    path = Path(config.STORE_DIR) / get_provider().name / "fundamentals.parquet" if config.STORE_DIR else None
+    return FundamentalsSnapshot(path, ttl=config.SNAPSHOT_TTL)
@@ -0,0 +1,241 @@
+"""Persistent Parquet store of OHLCV bars, one file per symbol and interval."""
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from market_data.files import write_atomic
+from market_data.quality import PRICE_COLUMNS, clean_bars
+
+# Covered date ranges are kept in the Parquet schema metadata so data and
+# coverage are always written together in one atomic file replace.
+_COVERAGE_KEY = b"market_data.coverage"
+
+# Bars are stored unadjusted for dividends (plus a Dividends column) since
+# format 2, and kept on the share basis of the latest split since format 3;
+# files written before that are treated as never downloaded.
+_FORMAT_KEY = b"market_data.format"
+FORMAT = b"3"
+
+
+# Coarser bars kept next to the daily ones: level -> pandas period frequency
+PYRAMID_LEVELS = {"1wk": "W-SUN", "1mo": "M"}
+
+_AGGREGATIONS = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def resample_bars(frame, level):
+    """Aggregate daily OHLCV bars to ``level`` ("1wk" or "1mo"), labelled by period start."""
+    periods = frame.index.to_period(PYRAMID_LEVELS[level])
+    bars = frame.groupby(periods).agg({c: f for c, f in _AGGREGATIONS.items() if c in frame.columns})
+    bars.index = bars.index.start_time.rename(frame.index.name)
+    return bars
+
+
+def merge_ranges(ranges):
+    """Merge overlapping or touching [start, end) ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def find_gaps(ranges, start, end):
+    """Sub-ranges of [start, end) that are not covered by ``ranges``."""
+    gaps = []
+    cursor = start
+    for range_start, range_end in merge_ranges(ranges):
+        if range_end <= cursor:
+            continue
+        if range_start >= end:
+            break
+        if range_start > cursor:
+            gaps.append((cursor, range_start))
+        cursor = max(cursor, range_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def adjust_for_splits(existing, frame):
+    """Return (``existing`` on the share basis of ``frame``, whether it was rescaled).
+
+    The provider returns every download on the current share basis, so bars
+    stored before a split that ``frame`` reports would otherwise keep an
+    unadjusted cliff where ``frame`` starts. Only bars before ``frame`` are
+    rescaled, and only when the price move from the last of them to the
+    first new bar is closer to the split ratio than to no split at all;
+    splits ``existing`` already holds have been applied before.
+    """
+    if "Stock Splits" not in frame.columns or "Close" not in existing.columns or frame.empty:
+        return existing, False
+    splits = frame["Stock Splits"].fillna(0)
+    splits = splits[splits > 0]
+    if "Stock Splits" in existing.columns:
+        seen = existing["Stock Splits"].fillna(0)
+        splits = splits[~splits.index.isin(seen.index[seen > 0])]
+    older = existing.index < frame.index.min()
+    last_close = existing["Close"][older].dropna()
+    first_close = frame["Close"].dropna() if "Close" in frame.columns else frame.iloc[:0]
+    if splits.empty or last_close.empty or first_close.empty:
+        return existing, False
+
+    ratio = float(splits.prod())
+    move = first_close.iloc[0] / last_close.iloc[-1]
+    if not abs(np.log(move * ratio)) < abs(np.log(move)):
+        # Already on the current basis, e.g. downloaded after the split for an earlier range
+        return existing, False
+    scale = np.where(older, 1 / ratio, 1.0)
+    columns = [c for c in PRICE_COLUMNS + ["Dividends"] if c in existing.columns]
+    existing = existing.assign(**existing[columns].mul(scale, axis=0))
+    if "Volume" in existing.columns:
+        existing["Volume"] = existing["Volume"] / scale
+    return existing, True
+
+
+def _is_current(schema):
+    return (schema.metadata or {}).get(_FORMAT_KEY) == FORMAT
+
+
+def _parse_coverage(schema):
+    if not _is_current(schema):
+        return []
+    return [
+        (pd.Timestamp(start), pd.Timestamp(end))
+        for start, end in json.loads(schema.metadata.get(_COVERAGE_KEY, b"[]"))
+    ]
+
+
+class BarStore:
+    """Stores bars as zstd-compressed Parquet under ``root/<interval>/<symbol>.parquet``
+    together with the date ranges that have already been downloaded.
+
+    Daily bars also get weekly and monthly aggregates of the cleaned bars
+    under ``root/1d-<level>/``, re-aggregated from the first period each
+    append touches rather than rebuilt.
+
+    Stored bars are kept on the provider's current share basis: when an
+    append reports a split, the bars stored before it are rescaled.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def _path(self, symbol, interval):
+        # Index symbols like ^GSPC are fine on disk, but keep path separators out
+        return self.root / interval / f"{symbol.replace('/', '_')}.parquet"
+
+    def _read(self, symbol, interval):
+        path = self._path(symbol, interval)
+        if not path.exists():
+            return pd.DataFrame(), []
+        table = pq.read_table(path)
+        if not _is_current(table.schema):
+            return pd.DataFrame(), []
+        return table.to_pandas(), _parse_coverage(table.schema)
+
+    def coverage(self, symbol, interval):
+        path = self._path(symbol, interval)
+        if not path.exists():
+            return []
+        # Only the footer is read, not the bars themselves
+        return _parse_coverage(pq.read_schema(path))
+
+    def missing_ranges(self, symbol, interval, start, end):
+        """Date ranges within [start, end) that still have to be downloaded."""
+        return find_gaps(self.coverage(symbol, interval), start, end)
+
+    def read(self, symbol, interval, start, end, columns=None):
+        """Bars in [start, end); ``columns`` limits which columns are decoded
+        (those the file doesn't have are left out)."""
+        path = self._path(symbol, interval)
+        if not path.exists():
+            return pd.DataFrame()
+        schema = pq.read_schema(path)
+        if not _is_current(schema):
+            return pd.DataFrame()
+        if columns:
+            columns = [c for c in columns if c in schema.names]
+        frame = pq.read_table(path, columns=list(columns) if columns else None,
+                              use_pandas_metadata=True).to_pandas()
+        return frame.loc[(frame.index >= start) & (frame.index < end)]
+
+    def append(self, symbol, interval, frame, start, end):
+        """Add freshly downloaded bars for [start, end) and mark the range covered."""
+        with self._lock:
+            first_new = frame.index.min() if not frame.empty else None
+            existing, coverage = self._read(symbol, interval)
+            if not existing.empty:
+                existing, rescaled = adjust_for_splits(existing, frame)
+                if rescaled:
+                    # Every period before the split changed
+                    first_new = existing.index.min()
+                frame = pd.concat([existing, frame])
+                frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+            if start < end:
+                coverage = merge_ranges(coverage + [(start, end)])
+
+            table = pa.Table.from_pandas(frame)
+            metadata = dict(table.schema.metadata or {})
+            metadata[_COVERAGE_KEY] = json.dumps(
+                [[s.isoformat(), e.isoformat()] for s, e in coverage]
+            ).encode()
+            metadata[_FORMAT_KEY] = FORMAT
+            self._write(self._path(symbol, interval), table.replace_schema_metadata(metadata))
+
+            if interval == "1d" and first_new is not None:
+                self._update_levels(symbol, frame, first_new)
+
+    def archive(self, symbol, interval, frame):
+        """Keep bars that have no coverage to track (e.g. spilled intraday bars).
+
+        Written to one file per UTC day under ``root/<interval>/<day>/``, so
+        each archive call only rewrites the days it touches.
+        """
+        for day, bars in frame.groupby(frame.index.normalize()):
+            self.append(symbol, f"{interval}/{day:%Y-%m-%d}", bars, day, day)
+
+    def _write(self, path, table):
+        write_atomic(path, lambda tmp_path: pq.write_table(table, tmp_path, compression="zstd"))
+
+    def _update_levels(self, symbol, daily, first_new):
+        # Aggregate the bars the daily view shows, not the raw ones
+        daily, report = clean_bars(daily, freq="B")
+        if report.splits:
+            first_new = daily.index.min()
+        for level, freq in PYRAMID_LEVELS.items():
+            # Periods before the one holding the earliest new bar are unchanged
+            period_start = first_new.to_period(freq).start_time
+            bars = resample_bars(daily.loc[daily.index >= period_start], level)
+            path = self._path(symbol, f"1d-{level}")
+            if path.exists() and _is_current(pq.read_schema(path)):
+                kept = pq.read_table(path).to_pandas()
+                bars = pd.concat([kept.loc[kept.index < period_start], bars])
+            table = pa.Table.from_pandas(bars)
+            self._write(path, table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                                             _FORMAT_KEY: FORMAT}))
+
+    def read_level(self, symbol, interval, level, start, end):
+        """Aggregated ``level`` bars of the periods overlapping [start, end), or None if
+        there are no ``interval`` bars. Built on first use for bars stored before the pyramid
+        (or before its current format)."""
+        if interval != "1d":
+            return None
+        path = self._path(symbol, f"1d-{level}")
+        if not path.exists() or not _is_current(pq.read_schema(path)):
+            daily, _ = self._read(symbol, interval)
+            if daily.empty:
+                return None
+            with self._lock:
+                self._update_levels(symbol, daily, daily.index.min())
+        bars = pq.read_table(path).to_pandas()
+        period_start = start.to_period(PYRAMID_LEVELS[level]).start_time
+        return bars.loc[(bars.index >= period_start) & (bars.index < end)]
@@ -0,0 +1,229 @@
+"""Searchable directory of listed symbols and company names.
+
+Loaded once from a bundled data file (``data/symbols.csv``) or from
+``MARKET_DATA_SYMBOLS_FILE``, which may also be a Nasdaq Trader listing
+(``nasdaqlisted.txt`` / ``otherlisted.txt``, pipe-delimited).
+
+Rebuild the bundled file from newer listings with
+``python -m market_data.symbols market_data/data/symbols.csv nasdaqlisted.txt otherlisted.txt``;
+the first file listing a symbol names it, so the index rows stay.
+"""
+import argparse
+import csv
+import heapq
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+from pathlib import Path
+
+from market_data import config
+from market_data.files import write_atomic
+
+BUNDLED_FILE = Path(__file__).resolve().parent / "data" / "symbols.csv"
+
+# Match scores; an entry's rank is the sum of its best score for each query token
+EXACT_SYMBOL = 1.0
+SYMBOL_PREFIX = 0.9
+EXACT_WORD = 0.8
+WORD_PREFIX = 0.7
+FUZZY = 0.6  # scaled by bigram similarity
+
+# Bigram (Dice) similarity below which a word is not considered a typo of the query
+FUZZY_CUTOFF = 0.5
+
+# Words that appear in most company names and would match everything
+STOP_WORDS = {"INC", "CORP", "CORPORATION", "CO", "LTD", "PLC", "THE", "AND", "CLASS", "COMMON",
+              "STOCK", "SHARES", "HOLDINGS", "GROUP", "NV", "SA", "AG", "ADR", "ADS"}
+
+
+def _words(text):
+    return [w for w in re.findall(r"[A-Z0-9]+", text.upper()) if w not in STOP_WORDS]
+
+
+def yahoo_symbol(symbol):
+    """Spell a Nasdaq Trader (CQS) symbol the way the provider does: "BRK.B" -> "BRK-B", "ABR$D" -> "ABR-PD"."""
+    return symbol.replace(".", "-").replace("$", "-P")
+
+
+def read_entries(path):
+    """Read (symbol, name) pairs from a ``symbol,name`` CSV or a pipe-delimited Nasdaq Trader listing."""
+    with open(path, newline="", encoding="utf-8") as f:
+        header = f.readline()
+        listing = "|" in header
+        f.seek(0)
+        reader = csv.DictReader(f, delimiter="|" if listing else ",")
+        symbol_key = next(k for k in reader.fieldnames if k.lower() in ("symbol", "act symbol"))
+        name_key = next(k for k in reader.fieldnames if k.lower() in ("name", "security name"))
+        entries = []
+        for row in reader:
+            symbol = (row.get(symbol_key) or "").strip().upper()
+            # Listing files end with a "File Creation Time" line and flag test issues
+            if not symbol or symbol.startswith("FILE CREATION") or row.get("Test Issue") == "Y":
+                continue
+            name = (row.get(name_key) or "").strip()
+            if listing:
+                # "Apple Inc. - Common Stock": the security type isn't part of the company name
+                symbol, name = yahoo_symbol(symbol), name.split(" - ")[0]
+            entries.append((symbol, name))
+    return entries
+
+
+def _bigrams(word):
+    return {word[i:i + 2] for i in range(len(word) - 1)} or {word}
+
+
+class _Vocabulary:
+    """Sorted keys with posting lists, for exact, prefix and fuzzy key lookups."""
+
+    def __init__(self, postings):
+        self.postings = dict(postings)
+        self.keys = sorted(self.postings)
+        self._bigrams = defaultdict(list)
+        self._gram_counts = {}
+        for key in self.keys:
+            grams = _bigrams(key)
+            self._gram_counts[key] = len(grams)
+            for gram in grams:
+                self._bigrams[gram].append(key)
+
+    def prefixed(self, prefix):
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            yield self.keys[i]
+            i += 1
+
+    def similar(self, word, cutoff=FUZZY_CUTOFF):
+        """Yield (key, Dice similarity) for keys sharing enough bigrams with ``word``."""
+        grams = _bigrams(word)
+        shared = defaultdict(int)
+        for gram in grams:
+            for key in self._bigrams.get(gram, ()):
+                shared[key] += 1
+        for key, count in shared.items():
+            score = 2 * count / (len(grams) + self._gram_counts[key])
+            if score >= cutoff:
+                yield key, score
+
+
+class SymbolDirectory:
+    """Symbols and company names with a prefix, word and bigram index."""
+
+    def __init__(self, entries):
+        self._names = dict(entries)
+        symbols, words = defaultdict(list), defaultdict(list)
+        for symbol, name in self._names.items():
+            symbols[symbol].append(symbol)
+            for word in set(_words(name)):
+                words[word].append(symbol)
+        self._symbols = _Vocabulary(symbols)
+        self._words = _Vocabulary(words)
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a ``symbol,name`` CSV or a pipe-delimited Nasdaq Trader listing."""
+        return cls(read_entries(path))
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, symbol):
+        return symbol in self._names
+
+    def name(self, symbol):
+        return self._names.get(symbol)
+
+    def search(self, query, k=10):
+        """Return up to ``k`` (symbol, name, score) matches for ``query``, best first.
+
+        Each query word is matched against symbols (exact, then prefix) and
+        against the words of company names (exact, prefix, then typo-tolerant
+        bigram similarity), so "appl", "micro soft" and "nvdia" all find
+        their company.
+        """
+        scores = defaultdict(float)
+        for term in query.upper().split():
+            best = {}
+
+            def offer(symbols, score):
+                for symbol in symbols:
+                    if score > best.get(symbol, 0):
+                        best[symbol] = score
+
+            if term in self._symbols.postings:
+                offer([term], EXACT_SYMBOL)
+            for symbol in self._symbols.prefixed(term):
+                offer([symbol], SYMBOL_PREFIX - 0.01 * (len(symbol) - len(term)))
+            for word in _words(term):
+                offer(self._words.postings.get(word, ()), EXACT_WORD)
+                for key in self._words.prefixed(word):
+                    offer(self._words.postings[key], WORD_PREFIX - 0.01 * (len(key) - len(word)))
+                if len(word) >= 3:
+                    for key, similarity in self._words.similar(word):
+                        offer(self._words.postings[key], FUZZY * similarity)
+                    for key, similarity in self._symbols.similar(word):
+                        offer([key], FUZZY * similarity)
+            for symbol, score in best.items():
+                scores[symbol] += score
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -len(item[0])))
+        return [(symbol, self._names[symbol], round(score, 3)) for symbol, score in top]
+
+    def suggest(self, symbol, n=3):
+        """Symbols that ``symbol`` is probably a typo of, closest first."""
+        # Bigrams narrow the candidates, edit similarity ranks them (and catches swapped letters)
+        term = symbol.upper()
+        scored = []
+        for key, similarity in self._symbols.similar(term, cutoff=0):
+            ratio = SequenceMatcher(None, term, key).ratio()
+            if key != term and ratio >= 0.6:
+                scored.append((ratio + 0.1 * similarity, key))
+        return [key for _, key in heapq.nlargest(n, scored)]
+
+
+def parse_tickers(text):
+    """Split comma or whitespace separated input into unique uppercase tickers, in order."""
+    return list(dict.fromkeys(t.upper() for t in re.split(r"[,\s]+", text) if t))
+
+
+def validate_tickers(tickers, directory=None):
+    """Return (known tickers, {unknown ticker: suggested corrections}).
+
+    Checked against the local symbol directory only, so a typo costs no
+    provider request. The directory doesn't list every symbol the provider
+    serves, so an unknown ticker is suspect rather than invalid.
+    """
+    directory = directory or get_directory()
+    known = [t for t in tickers if t in directory]
+    unknown = {t: directory.suggest(t) for t in tickers if t not in directory}
+    return known, unknown
+
+
+@lru_cache(maxsize=None)
+def get_directory():
+    return SymbolDirectory.from_file(config.SYMBOLS_FILE or BUNDLED_FILE)
+
+
+def write_entries(entries, path):
+    """Write (symbol, name) pairs as a ``symbol,name`` CSV sorted by symbol."""
+    def write(tmp_path):
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(["symbol", "name"])
+            writer.writerows(sorted(entries))
+    write_atomic(Path(path), write)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the bundled symbol list.")
+    parser.add_argument("files", nargs="+",
+                        help="symbol,name CSVs or Nasdaq Trader listings, earlier files win")
+    parser.add_argument("--output", default=BUNDLED_FILE, help="CSV to write")
+    args = parser.parse_args()
+    names = {}
+    for path in args.files:
+        for symbol, name in read_entries(path):
+            names.setdefault(symbol, name)
+    write_entries(names.items(), args.output)
+    print(f"Wrote {len(names)} symbols to {args.output}")
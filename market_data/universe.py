@@ -0,0 +1,261 @@
+"""The investable universe and a memory-mapped price tensor covering it.
+
+The tensor is a dense dates x symbols x fields float array written by a
+maintenance job (``python -m market_data.universe``) and opened read-only
+by every server process, so a portfolio's price matrix is a column gather
+from shared pages instead of a fetch.
+"""
+import argparse
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from market_data import config
+from market_data.files import write_atomic
+
+# Nasdaq 100 companies
+NASDAQ_100 = {
+    'AAPL': 'Apple Inc.',
+    'MSFT': 'Microsoft Corporation',
+    'GOOGL': 'Alphabet Inc.',
+    'AMZN': 'Amazon.com Inc.',
+    'NVDA': 'NVIDIA Corporation',
+    'META': 'Meta Platforms Inc.',
+    'TSLA': 'Tesla Inc.',
+    'AVGO': 'Broadcom Inc.',
+    'PEP': 'PepsiCo Inc.',
+    'COST': 'Costco Wholesale Corporation',
+    'CSCO': 'Cisco Systems Inc.',
+    'AMD': 'Advanced Micro Devices Inc.',
+    'TMUS': 'T-Mobile US Inc.',
+    'INTC': 'Intel Corporation',
+    'QCOM': 'QUALCOMM Incorporated',
+    'INTU': 'Intuit Inc.',
+    'ADBE': 'Adobe Inc.',
+    'TXN': 'Texas Instruments Inc.',
+    'NFLX': 'Netflix Inc.',
+    'CMCSA': 'Comcast Corporation',
+    'HON': 'Honeywell International Inc.',
+    'AMAT': 'Applied Materials Inc.',
+    'BKNG': 'Booking Holdings Inc.',
+    'SBUX': 'Starbucks Corporation',
+    'GILD': 'Gilead Sciences Inc.',
+    'ADI': 'Analog Devices Inc.',
+    'MDLZ': 'Mondelez International Inc.',
+    'PYPL': 'PayPal Holdings Inc.',
+    'REGN': 'Regeneron Pharmaceuticals Inc.',
+    'VRTX': 'Vertex Pharmaceuticals Inc.',
+    'ISRG': 'Intuitive Surgical Inc.',
+    'LRCX': 'Lam Research Corporation',
+    'MU': 'Micron Technology Inc.',
+    'ATVI': 'Activision Blizzard Inc.',
+    'CSX': 'CSX Corporation',
+    'KLAC': 'KLA Corporation',
+    'MRVL': 'Marvell Technology Inc.',
+    'GOOG': 'Alphabet Inc. Class C',
+    'PANW': 'Palo Alto Networks Inc.',
+    'KDP': 'Keurig Dr Pepper Inc.',
+    'SNPS': 'Synopsys Inc.',
+    'CDNS': 'Cadence Design Systems Inc.',
+    'NXPI': 'NXP Semiconductors N.V.',
+    'FTNT': 'Fortinet Inc.',
+    'ADP': 'Automatic Data Processing Inc.',
+    'ORLY': "O'Reilly Automotive Inc.",
+    'MNST': 'Monster Beverage Corporation',
+    'MAR': 'Marriott International Inc.',
+    'MCHP': 'Microchip Technology Inc.',
+    'ABNB': 'Airbnb Inc.',
+    'ADSK': 'Autodesk Inc.',
+    'IDXX': 'IDEXX Laboratories Inc.',
+    'BIIB': 'Biogen Inc.',
+    'DXCM': 'DexCom Inc.',
+    'EXC': 'Exelon Corporation',
+    'CHTR': 'Charter Communications Inc.',
+    'WBD': 'Warner Bros. Discovery Inc.',
+    'ZM': 'Zoom Video Communications Inc.',
+    'TEAM': 'Atlassian Corporation Plc',
+    'ROST': 'Ross Stores Inc.',
+    'ODFL': 'Old Dominion Freight Line Inc.',
+    'VRSK': 'Verisk Analytics Inc.',
+    'CPRT': 'Copart Inc.',
+    'BKR': 'Baker Hughes Company',
+    'CTAS': 'Cintas Corporation',
+    'PAYX': 'Paychex Inc.',
+    'PCAR': 'PACCAR Inc',
+    'EA': 'Electronic Arts Inc.',
+    'GFS': 'GLOBALFOUNDRIES Inc.',
+    'SIRI': 'Sirius XM Holdings Inc.',
+    'DLTR': 'Dollar Tree Inc.',
+    'ILMN': 'Illumina Inc.',
+    'JD': 'JD.com Inc.',
+    'KHC': 'The Kraft Heinz Company',
+    'MRNA': 'Moderna Inc.',
+    'FANG': 'Diamondback Energy Inc.',
+    'XEL': 'Xcel Energy Inc.',
+    'EBAY': 'eBay Inc.',
+    'FAST': 'Fastenal Company',
+    'CRWD': 'CrowdStrike Holdings Inc.',
+    'ANSS': 'ANSYS Inc.',
+    'ASML': 'ASML Holding N.V.',
+    'AEP': 'American Electric Power Company Inc.',
+    'WDAY': 'Workday Inc.',
+    'CTSH': 'Cognizant Technology Solutions Corporation',
+    'CEG': 'Constellation Energy Corporation',
+    'DDOG': 'Datadog Inc.',
+    'WBA': 'Walgreens Boots Alliance Inc.',
+    'LCID': 'Lucid Group Inc.',
+    'RIVN': 'Rivian Automotive Inc.',
+    'ZS': 'Zscaler Inc.',
+    'ENPH': 'Enphase Energy Inc.',
+    'ALGN': 'Align Technology Inc.',
+    'GEHC': 'GE HealthCare Technologies Inc.',
+    'ON': 'ON Semiconductor Corporation',
+    'TTD': 'The Trade Desk Inc.',
+    'VTRS': 'Viatris Inc.',
+    'RYAAY': 'Ryanair Holdings plc',
+    'POOL': 'Pool Corporation',
+    'BIDU': 'Baidu Inc.',
+    'PDD': 'PDD Holdings Inc.'
+}
+
+# Portfolio a new session starts with
+DEFAULT_PORTFOLIO = ["AAPL", "MSFT", "GOOGL", "NVDA"]
+
+# Benchmarks offered on the Risk Metrics page
+BENCHMARKS = ["SPY", "^GSPC", "^DJI", "^IXIC"]
+
+UNIVERSE = list(NASDAQ_100) + BENCHMARKS
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume", "Total Return")
+
+# Name of the file pointing at the current tensor version
+_CURRENT = "CURRENT"
+
+
+class UniverseTensor:
+    """Read-only view of one tensor version."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        meta = json.loads((self.path / "meta.json").read_text())
+        self.dates = pd.DatetimeIndex(meta["dates"])
+        self.symbols = meta["symbols"]
+        self.fields = meta["fields"]
+        self.start = pd.Timestamp(meta["start"])
+        self.end = pd.Timestamp(meta["end"])
+        self.built_at = meta["built_at"]
+        self._symbol_pos = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.data = np.memmap(
+            self.path / "prices.bin",
+            dtype=meta["dtype"],
+            mode="r",
+            shape=(len(self.dates), len(self.symbols), len(self.fields)),
+        )
+
+    def age(self):
+        return time.time() - self.built_at
+
+    def covers(self, tickers, start, end):
+        return self.start <= start and end <= self.end and all(t in self._symbol_pos for t in tickers)
+
+    def gather(self, tickers, start, end, field="Close"):
+        """Wide matrix of ``field`` for ``tickers`` over [start, end).
+
+        Only the rows and columns asked for are read from the mapped file.
+        """
+        rows = slice(self.dates.searchsorted(start), self.dates.searchsorted(end))
+        columns = [self._symbol_pos[t] for t in tickers]
+        values = self.data[rows, :, self.fields.index(field)][:, columns]
+        matrix = pd.DataFrame(values, index=self.dates[rows], columns=list(tickers))
+        # Dates on which none of the selected symbols traded (e.g. another exchange's holidays)
+        return matrix.dropna(how="all")
+
+
+_open_lock = threading.Lock()
+_opened = {}
+
+
+def open_universe(root=None):
+    """The current tensor under ``root``, or None if none has been built.
+
+    Each version is mapped once per process and reused until the
+    maintenance job publishes a new one.
+    """
+    root = Path(root or config.UNIVERSE_DIR)
+    try:
+        version = (root / _CURRENT).read_text().strip()
+    except FileNotFoundError:
+        return None
+    with _open_lock:
+        tensor = _opened.get(root)
+        if tensor is None or tensor.path.name != version:
+            tensor = _opened[root] = UniverseTensor(root / version)
+        return tensor
+
+
+def build_universe(start, end, symbols=None, fields=FIELDS, root=None, cache=None, progress=print):
+    """Fetch ``symbols`` over [start, end) and publish them as a new tensor version."""
+    from market_data.cache import get_price_cache
+
+    root = Path(root or config.UNIVERSE_DIR)
+    symbols = list(symbols or UNIVERSE)
+    cache = cache or get_price_cache()
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+
+    frames, failures = cache.get_history(
+        symbols, start, end,
+        progress=lambda done, total: progress(f"Downloaded {done}/{total}"),
+    )
+    for symbol, error in failures.items():
+        progress(f"Skipping {symbol}: {error}")
+    symbols = [s for s in symbols if s in frames]
+
+    dates = pd.DatetimeIndex(sorted(set().union(*(frames[s].index for s in symbols))))
+    version = time.strftime("%Y%m%d-%H%M%S")
+    path = root / version
+    path.mkdir(parents=True, exist_ok=True)
+
+    data = np.memmap(path / "prices.bin", dtype="float64", mode="w+",
+                     shape=(len(dates), len(symbols), len(fields)))
+    data[:] = np.nan
+    for i, symbol in enumerate(symbols):
+        frame = frames[symbol].reindex(dates)
+        for k, field in enumerate(fields):
+            if field in frame.columns:
+                data[:, i, k] = frame[field].to_numpy(dtype="float64")
+    data.flush()
+    del data
+
+    meta = {
+        "dates": [d.isoformat() for d in dates],
+        "symbols": symbols,
+        "fields": list(fields),
+        "dtype": "float64",
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "built_at": time.time(),
+    }
+    (path / "meta.json").write_text(json.dumps(meta))
+
+    # Switching the pointer is atomic; readers pick up the new version on their next call
+    write_atomic(root / _CURRENT, lambda tmp_pointer: tmp_pointer.write_text(version))
+
+    # Keep the previous version around for processes that still have it mapped
+    for old in sorted(p for p in root.iterdir() if p.is_dir())[:-2]:
+        shutil.rmtree(old, ignore_errors=True)
+    progress(f"Published universe {version}: {len(dates)} dates x {len(symbols)} symbols")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the memory-mapped universe price tensor.")
+    parser.add_argument("--years", type=int, default=10, help="years of history to include")
+    args = parser.parse_args()
+    today = pd.Timestamp.now().normalize()
+    # End tomorrow so today's bar is included
+    build_universe(today - pd.DateOffset(years=args.years), today + pd.Timedelta(days=1))
@@ -0,0 +1,86 @@
+"""Background warm-up of the price cache after a deploy or restart."""
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+
+from market_data import config
+from market_data.cache import get_price_cache
+from market_data.snapshot import get_snapshot
+from market_data.universe import BENCHMARKS, DEFAULT_PORTFOLIO, NASDAQ_100
+
+
+class CacheWarmer:
+    """Preloads the default portfolio, the benchmarks and the Nasdaq 100
+    into ``cache`` (and their company info into ``snapshot``) on a daemon
+    thread, then again every ``interval`` seconds.
+
+    Progress is kept in ``status`` so a page can report it; nothing here
+    blocks a script run.
+    """
+
+    def __init__(self, cache, days, interval, snapshot=None):
+        self.cache = cache
+        self.snapshot = snapshot
+        self.days = days
+        self.interval = interval
+        self.status = {"state": "idle", "done": 0, "total": 0, "runs": 0,
+                       "failed": {}, "info_failed": {}, "finished_at": None}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def symbols(self):
+        # Most likely to be requested first, so warmed first
+        return list(dict.fromkeys(DEFAULT_PORTFOLIO + BENCHMARKS + list(NASDAQ_100)))
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self.warm()
+            if not self.interval:
+                return
+            time.sleep(self.interval)
+
+    def warm(self):
+        symbols = self.symbols()
+        today = pd.Timestamp.now().normalize()
+        start, end = today - pd.Timedelta(days=self.days), today + pd.Timedelta(days=1)
+        self.status.update(state="running", done=0, total=len(symbols), failed={})
+
+        # Small batches so the default portfolio is ready long before the full universe
+        for i in range(0, len(symbols), config.FETCH_BATCH_SIZE):
+            batch = symbols[i:i + config.FETCH_BATCH_SIZE]
+            try:
+                _, failures = self.cache.get_history(batch, start, end)
+            except Exception as e:
+                failures = {symbol: str(e) for symbol in batch}
+            self.status["failed"].update(failures)
+            self.status["done"] += len(batch)
+
+        if self.snapshot is not None:
+            # Indices have no company info, so only stocks go into the snapshot
+            stocks = [s for s in symbols if s not in BENCHMARKS]
+            try:
+                info_failures = self.snapshot.refresh(stocks)
+            except Exception as e:
+                info_failures = {symbol: str(e) for symbol in stocks}
+            self.status["info_failed"] = info_failures
+
+        self.status.update(state="done", runs=self.status["runs"] + 1, finished_at=time.time())
+
+
+@st.cache_resource
+def get_warmer():
+    return CacheWarmer(get_price_cache(), config.WARMUP_DAYS, config.WARMUP_INTERVAL, get_snapshot())
+
+
+def start_warmer():
+    """Start the warm-up thread once per process; later calls do nothing."""
+    if config.WARMUP_ENABLED:
+        get_warmer().start()
@@ -0,0 +1,44 @@
+"""Streamlit widgets the pages share for showing data-layer state."""
+import streamlit as st
+
+from market_data.cache import data_quality_notes, get_close_matrices
+
+
+def show_quality_notes(tickers):
+    """An expander listing what cleaning found in the series of ``tickers``, if anything."""
+    notes = data_quality_notes(tickers)
+    if notes:
+        with st.expander("⚠️ Data quality"):
+            for note in notes:
+                st.write(note)
+
+
+def show_window_note(prices, late):
+    """A note naming the tickers whose late first price moved the start of ``prices``.
+
+    ``late`` is the {ticker: first date} dict returned by ``get_close_matrices``.
+    """
+    if late and not prices.empty:
+        st.info(f"Analysis starts on {prices.index[0]:%Y-%m-%d}, the first date every ticker has a price. "
+                "Listed later: " + ", ".join(f"{ticker} ({day:%Y-%m-%d})" for ticker, day in late.items()))
+
+
+def show_fetch_progress(progress_bar):
+    """A ``progress(done, total)`` callback that advances ``progress_bar``."""
+    def update(done, total):
+        progress_bar.progress(done / total, text=f"Downloaded {done} of {total} price series")
+    return update
+
+
+def load_close_matrices(tickers, benchmark, start_date, end_date, budget=None, field="Close"):
+    """``get_close_matrices`` for ``tickers`` and ``benchmark`` behind a progress bar.
+
+    Returns the read-only (prices, returns, failures, late) of
+    ``get_close_matrices``, with the benchmark on the same trading calendar.
+    """
+    progress_bar = st.progress(0.0, text="Loading price data...")
+    try:
+        return get_close_matrices(list(tickers) + [benchmark], start_date, end_date,
+                                  progress=show_fetch_progress(progress_bar), budget=budget, field=field)
+    finally:
+        progress_bar.empty()
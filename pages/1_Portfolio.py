@@ -1,21 +1,28 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 
+from market_data import (DEFAULT_PORTFOLIO, NASDAQ_100, FetchBudget, config, get_directory, get_snapshot,
+                         parse_tickers, start_warmer, validate_tickers)
+
 st.set_page_config(
     page_title="Portfolio Setup",
     page_icon="💼",
     layout="wide"
 )
 
+# Preload common price series in the background (once per server process)
+start_warmer()
+
 # Initialize session state for shared variables
 if 'tickers' not in st.session_state:
-    st.session_state.tickers = ["AAPL", "MSFT", "GOOGL", "NVDA"]
+    st.session_state.tickers = list(DEFAULT_PORTFOLIO)
 
 # When initializing or recalculating weights
 def calculate_balanced_weights(tickers):
     num_tickers = len(tickers)
+    if num_tickers == 0:
+        return {}
     base_weight = 100 // num_tickers  # Integer division
     remainder = 100 - (base_weight * num_tickers)
     
@@ -25,6 +32,20 @@ def calculate_balanced_weights(tickers):
         weights[ticker] = (base_weight + extra) / 100
     return weights
 
+def calculate_market_cap_weights(tickers, snapshot):
+    # Whole percentages proportional to market cap (largest remainders round up),
+    # or None if a ticker's market cap is unknown
+    caps = {ticker: (snapshot.get(ticker) or {}).get("market_cap") for ticker in tickers}
+    if not caps or not all(caps.values()):
+        return None
+    total = sum(caps.values())
+    exact = {ticker: 100 * cap / total for ticker, cap in caps.items()}
+    weights = {ticker: int(value) for ticker, value in exact.items()}
+    remainder = 100 - sum(weights.values())
+    for ticker in sorted(exact, key=lambda t: exact[t] - weights[t], reverse=True)[:remainder]:
+        weights[ticker] += 1
+    return weights
+
 # Use this function when initializing weights
 if 'weights' not in st.session_state:
     st.session_state.weights = calculate_balanced_weights(st.session_state.tickers)
@@ -37,9 +58,27 @@ if 'end_date' not in st.session_state:
 # Sidebar setup
 st.sidebar.title("Portfolio Setup")
 
-# Stock ticker input
-ticker_input = st.sidebar.text_input("Enter Stock Ticker(s) (comma-separated)", ", ".join(st.session_state.tickers))
-st.session_state.tickers = [ticker.strip() for ticker in ticker_input.split(",")]
+# Stock ticker input, normalized and checked against the local symbol directory
+# so typos get suggestions before anything is downloaded. The directory doesn't
+# hold every symbol the provider knows (other exchanges, share classes), so
+# unknown tickers are only flagged, never dropped
+# The raw text is kept so entries stay as typed; buttons that change the
+# portfolio drop it to show the new list
+if 'ticker_text' not in st.session_state:
+    st.session_state.ticker_text = ", ".join(st.session_state.tickers)
+ticker_input = st.sidebar.text_input("Enter Stock Ticker(s) (comma-separated)", st.session_state.ticker_text)
+st.session_state.ticker_text = ticker_input
+entered_tickers = parse_tickers(ticker_input)
+_, unknown_tickers = validate_tickers(entered_tickers)
+for ticker, suggestions in unknown_tickers.items():
+    hint = f" Did you mean {', '.join(suggestions)}?" if suggestions else ""
+    st.sidebar.warning(f"{ticker} is not in the symbol directory, check it is a valid ticker.{hint}")
+if entered_tickers:
+    st.session_state.tickers = entered_tickers
+else:
+    # Nothing entered (empty field or only separators)
+    st.sidebar.info("No tickers entered, keeping the current portfolio: "
+                    + (", ".join(st.session_state.tickers) or "none"))
 
 # Date range selection
 st.session_state.start_date = st.sidebar.date_input("Start Date", st.session_state.start_date)
@@ -51,6 +90,20 @@ total_weight = 0
 
 # Add radio button to choose input method
 weight_input_method = st.sidebar.radio("Weight Input Method", ["Sliders", "Text Input"])
+default_weighting = st.sidebar.radio("Default Weights", ["Equal", "Market Cap"], horizontal=True)
+
+# Default weights come from the fundamentals snapshot, only missing market caps are fetched
+snapshot = get_snapshot()
+default_weights = None
+if default_weighting == "Market Cap":
+    snapshot.refresh([t for t in st.session_state.tickers if snapshot.get(t) is None],
+                     budget=FetchBudget(config.PAGE_FETCH_BUDGET))
+    default_weights = calculate_market_cap_weights(st.session_state.tickers, snapshot)
+    if default_weights is None:
+        st.sidebar.caption("Market cap unknown for some tickers, using equal weights.")
+if default_weights is None:
+    default_weights = {ticker: round(weight * 100)
+                       for ticker, weight in calculate_balanced_weights(st.session_state.tickers).items()}
 
 # Initialize/reset weights dictionary
 weights = {}
@@ -59,11 +112,7 @@ for ticker in st.session_state.tickers:
     # Create a horizontal layout for each weight input
     weight_col1, weight_col2 = st.sidebar.columns([4, 1])
     
-    # Calculate the correct default weight for this ticker
-    num_tickers = len(st.session_state.tickers)
-    base_weight = 100 // num_tickers
-    remainder = 100 - (base_weight * num_tickers)
-    default_weight = base_weight + (1 if st.session_state.tickers.index(ticker) < remainder else 0)
+    default_weight = default_weights[ticker]
     
     with weight_col1:
         if weight_input_method == "Sliders":
@@ -74,6 +123,7 @@ for ticker in st.session_state.tickers:
     with weight_col2:
         if st.button("❌", key=f"delete_{ticker}"):
             st.session_state.tickers.remove(ticker)
+            del st.session_state.ticker_text
             st.rerun()
     
     total_weight += weight
@@ -102,138 +152,49 @@ st.info("""
 
 # Display basic stock info
 if st.button("Fetch Stock Data"):
-    for ticker in st.session_state.tickers:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
+    # Rows come from the fundamentals snapshot; only missing or expired tickers
+    # are looked up (in parallel), each expander drawn as soon as its data arrives
+    budget = FetchBudget(config.PAGE_FETCH_BUDGET)
+    for ticker, info, error in snapshot.iter_rows(st.session_state.tickers, budget=budget):
         with st.expander(f"{ticker} - Basic Information"):
+            if error:
+                st.warning(f"Could not load information for {ticker}: {error}")
+                if not info:
+                    continue
+                st.caption("Showing previously cached information.")
+
             col1, col2 = st.columns(2)
             
             with col1:
-                st.write("**Company Name:**", info.get('longName', 'N/A'))
-                st.write("**Sector:**", info.get('sector', 'N/A'))
-                st.write("**Industry:**", info.get('industry', 'N/A'))
+                st.write("**Company Name:**", info['name'] or 'N/A')
+                st.write("**Sector:**", info['sector'] or 'N/A')
+                st.write("**Industry:**", info['industry'] or 'N/A')
                 
             with col2:
-                st.write("**Market Cap:**", f"${info.get('marketCap', 0):,.2f}")
-                st.write("**Current Price:**", f"${info.get('currentPrice', 0):,.2f}")
-                st.write("**52 Week Range:**", f"${info.get('fiftyTwoWeekLow', 0):,.2f} - ${info.get('fiftyTwoWeekHigh', 0):,.2f}")
+                st.write("**Market Cap:**", f"${info['market_cap'] or 0:,.2f}")
+                st.write("**Current Price:**", f"${info['price'] or 0:,.2f}")
+                st.write("**52 Week Range:**", f"${info['low_52w'] or 0:,.2f} - ${info['high_52w'] or 0:,.2f}")
+
+# Sector breakdown of the current weights, read from the snapshot without any requests
+st.markdown("### Sector Allocation")
+sectors = snapshot.frame(st.session_state.tickers)["sector"].dropna()
+sector_weights = pd.Series(
+    {ticker: weight * 100 for ticker, weight in st.session_state.weights.items()}
+).groupby(lambda ticker: sectors.get(ticker) or "Unknown").sum()
+st.bar_chart(sector_weights.rename("Weight (%)"))
+unknown = [ticker for ticker in st.session_state.tickers if not sectors.get(ticker)]
+if unknown:
+    st.caption("Sector unknown for " + ", ".join(unknown) + ". Use Fetch Stock Data to load it.")
 
 # Nasdaq 100 Companies section
 st.markdown("### Nasdaq 100 Companies")
 search = st.text_input("Search companies", "")
 
-# Define Nasdaq 100 companies
-nasdaq100 = {
-    'AAPL': 'Apple Inc.',
-    'MSFT': 'Microsoft Corporation',
-    'GOOGL': 'Alphabet Inc.',
-    'AMZN': 'Amazon.com Inc.',
-    'NVDA': 'NVIDIA Corporation',
-    'META': 'Meta Platforms Inc.',
-    'TSLA': 'Tesla Inc.',
-    'AVGO': 'Broadcom Inc.',
-    'PEP': 'PepsiCo Inc.',
-    'COST': 'Costco Wholesale Corporation',
-    'CSCO': 'Cisco Systems Inc.',
-    'AMD': 'Advanced Micro Devices Inc.',
-    'TMUS': 'T-Mobile US Inc.',
-    'INTC': 'Intel Corporation',
-    'QCOM': 'QUALCOMM Incorporated',
-    'INTU': 'Intuit Inc.',
-    'ADBE': 'Adobe Inc.',
-    'TXN': 'Texas Instruments Inc.',
-    'NFLX': 'Netflix Inc.',
-    'CMCSA': 'Comcast Corporation',
-    'HON': 'Honeywell International Inc.',
-    'AMAT': 'Applied Materials Inc.',
-    'BKNG': 'Booking Holdings Inc.',
-    'SBUX': 'Starbucks Corporation',
-    'GILD': 'Gilead Sciences Inc.',
-    'ADI': 'Analog Devices Inc.',
-    'MDLZ': 'Mondelez International Inc.',
-    'PYPL': 'PayPal Holdings Inc.',
-    'REGN': 'Regeneron Pharmaceuticals Inc.',
-    'VRTX': 'Vertex Pharmaceuticals Inc.',
-    'ISRG': 'Intuitive Surgical Inc.',
-    'LRCX': 'Lam Research Corporation',
-    'MU': 'Micron Technology Inc.',
-    'ATVI': 'Activision Blizzard Inc.',
-    'CSX': 'CSX Corporation',
-    'KLAC': 'KLA Corporation',
-    'MRVL': 'Marvell Technology Inc.',
-    'GOOG': 'Alphabet Inc. Class C',
-    'PANW': 'Palo Alto Networks Inc.',
-    'KDP': 'Keurig Dr Pepper Inc.',
-    'SNPS': 'Synopsys Inc.',
-    'CDNS': 'Cadence Design Systems Inc.',
-    'NXPI': 'NXP Semiconductors N.V.',
-    'FTNT': 'Fortinet Inc.',
-    'ADP': 'Automatic Data Processing Inc.',
-    'ORLY': "O'Reilly Automotive Inc.",
-    'MNST': 'Monster Beverage Corporation',
-    'MAR': 'Marriott International Inc.',
-    'MCHP': 'Microchip Technology Inc.',
-    'ABNB': 'Airbnb Inc.',
-    'ADSK': 'Autodesk Inc.',
-    'IDXX': 'IDEXX Laboratories Inc.',
-    'BIIB': 'Biogen Inc.',
-    'DXCM': 'DexCom Inc.',
-    'EXC': 'Exelon Corporation',
-    'CHTR': 'Charter Communications Inc.',
-    'WBD': 'Warner Bros. Discovery Inc.',
-    'ZM': 'Zoom Video Communications Inc.',
-    'TEAM': 'Atlassian Corporation Plc',
-    'ROST': 'Ross Stores Inc.',
-    'ODFL': 'Old Dominion Freight Line Inc.',
-    'VRSK': 'Verisk Analytics Inc.',
-    'CPRT': 'Copart Inc.',
-    'BKR': 'Baker Hughes Company',
-    'CTAS': 'Cintas Corporation',
-    'PAYX': 'Paychex Inc.',
-    'PCAR': 'PACCAR Inc',
-    'EA': 'Electronic Arts Inc.',
-    'GFS': 'GLOBALFOUNDRIES Inc.',
-    'SIRI': 'Sirius XM Holdings Inc.',
-    'DLTR': 'Dollar Tree Inc.',
-    'ILMN': 'Illumina Inc.',
-    'JD': 'JD.com Inc.',
-    'KHC': 'The Kraft Heinz Company',
-    'MRNA': 'Moderna Inc.',
-    'FANG': 'Diamondback Energy Inc.',
-    'XEL': 'Xcel Energy Inc.',
-    'EBAY': 'eBay Inc.',
-    'FAST': 'Fastenal Company',
-    'CRWD': 'CrowdStrike Holdings Inc.',
-    'ANSS': 'ANSYS Inc.',
-    'ASML': 'ASML Holding N.V.',
-    'AEP': 'American Electric Power Company Inc.',
-    'WDAY': 'Workday Inc.',
-    'CTSH': 'Cognizant Technology Solutions Corporation',
-    'CEG': 'Constellation Energy Corporation',
-    'DDOG': 'Datadog Inc.',
-    'WBA': 'Walgreens Boots Alliance Inc.',
-    'LCID': 'Lucid Group Inc.',
-    'RIVN': 'Rivian Automotive Inc.',
-    'ZS': 'Zscaler Inc.',
-    'ENPH': 'Enphase Energy Inc.',
-    'ALGN': 'Align Technology Inc.',
-    'GEHC': 'GE HealthCare Technologies Inc.',
-    'ON': 'ON Semiconductor Corporation',
-    'TTD': 'The Trade Desk Inc.',
-    'VTRS': 'Viatris Inc.',
-    'RYAAY': 'Ryanair Holdings plc',
-    'POOL': 'Pool Corporation',
-    'BIDU': 'Baidu Inc.',
-    'PDD': 'PDD Holdings Inc.'
-}
-
-# Filter companies based on search
+# Search the whole symbol directory (ranked, typo tolerant) instead of just the Nasdaq 100
 if search:
-    filtered_companies = {k: v for k, v in nasdaq100.items() 
-                        if search.upper() in k or search.lower() in v.lower()}
+    filtered_companies = {symbol: name for symbol, name, _ in get_directory().search(search, k=20)}
 else:
-    filtered_companies = nasdaq100
+    filtered_companies = NASDAQ_100
 
 # Create a more responsive table layout
 for symbol, company in filtered_companies.items():
@@ -249,6 +210,7 @@ for symbol, company in filtered_companies.items():
                 st.session_state.tickers.append(symbol)
                 st.session_state.weights = {t: 1/len(st.session_state.tickers) 
                                           for t in st.session_state.tickers}
+                del st.session_state.ticker_text
                 st.rerun()
         else:
             st.write("✓ Added")
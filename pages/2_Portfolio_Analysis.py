@@ -1,11 +1,14 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
 
+from market_data import (RETURN_FIELDS, FetchBudget, compound_returns, config, covariance,
+                         data_age_caption, load_close_matrices, show_quality_notes, show_window_note,
+                         weighted_returns)
+
 st.set_page_config(page_title="Portfolio Analysis", page_icon="📊", layout="wide")
 
 # Check if portfolio is configured
@@ -13,17 +16,14 @@ if 'tickers' not in st.session_state:
     st.error("Please configure your portfolio in the Home page first!")
     st.stop()
 
+# Total return reinvests dividends, price return ignores them
+return_basis = st.sidebar.radio("Returns", list(RETURN_FIELDS), index=0)
+
 # Main content
 st.title("📊 Portfolio Analysis")
 
-@st.cache_data
-def fetch_portfolio_data(tickers, start_date, end_date):
-    data = pd.DataFrame()
-    for ticker in tickers:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(start=start_date, end=end_date)['Close']
-        data[ticker] = hist
-    return data
+# Market benchmark (S&P 500) for beta and alpha
+BENCHMARK = "^GSPC"
 
 def calculate_alpha(portfolio_returns, market_returns, rf_rate):
     beta = portfolio_returns.cov(market_returns) / market_returns.var()
@@ -32,7 +32,7 @@ def calculate_alpha(portfolio_returns, market_returns, rf_rate):
     return alpha * 252  # Annualized alpha
 
 def calculate_max_drawdown(returns):
-    cum_returns = (1 + returns).cumprod()
+    cum_returns = compound_returns(returns)
     rolling_max = cum_returns.expanding().max()
     drawdowns = cum_returns/rolling_max - 1
     return drawdowns.min()
@@ -43,7 +43,7 @@ def simulate_portfolio_scenario(portfolio_returns, max_drop, recovery):
     scenario_return = max_drop + (recovery * np.random.normal(0, vol))
     return scenario_return
 
-def calculate_risk_metrics(portfolio_returns):
+def calculate_risk_metrics(portfolio_returns, market_returns):
     rf_rate = 0.04  # Assume 4% risk-free rate
     excess_returns = portfolio_returns - rf_rate/252
     
@@ -86,7 +86,7 @@ def plot_correlation_heatmap(returns):
 
 def plot_risk_contribution(returns, weights):
     # Calculate covariance matrix
-    cov = returns.cov()
+    cov = covariance(returns)
     
     # Calculate portfolio volatility
     port_vol = np.sqrt(np.dot(weights.T, np.dot(cov, weights)))
@@ -153,19 +153,34 @@ def run_monte_carlo_simulation(portfolio_returns, market_returns, n_simulations=
 
 try:
     # Fetch data
-    df = fetch_portfolio_data(st.session_state.tickers, st.session_state.start_date, st.session_state.end_date)
-    
-    # Calculate daily returns
-    returns = df.pct_change()
-    
+    # All provider calls on this page share one time budget
+    fetch_budget = FetchBudget(config.PAGE_FETCH_BUDGET)
+    df, all_returns, failed_tickers, late_listings = load_close_matrices(st.session_state.tickers, BENCHMARK, st.session_state.start_date, st.session_state.end_date, fetch_budget, RETURN_FIELDS[return_basis])
+    if failed_tickers:
+        st.warning("Could not load data for: " + ", ".join(
+            f"{ticker} ({error})" for ticker, error in failed_tickers.items()))
+    if BENCHMARK not in df.columns:
+        st.error(f"No data available for benchmark {BENCHMARK}.")
+        st.stop()
+
+    # Holdings and benchmark share one calendar, so metrics need no further joins
+    holdings = [ticker for ticker in df.columns if ticker in st.session_state.tickers]
+    if not holdings:
+        st.error("No price data available for the selected tickers.")
+        st.stop()
+    st.caption(data_age_caption(df.columns, start_date=st.session_state.start_date,
+                                end_date=st.session_state.end_date, field=RETURN_FIELDS[return_basis]))
+    show_quality_notes(df.columns)
+    show_window_note(df, late_listings)
+    df, returns = df[holdings], all_returns[holdings]
+    market_returns = all_returns[BENCHMARK]
+
     # Calculate portfolio returns
-    portfolio_returns = pd.Series(0, index=returns.index)
-    for ticker, weight in st.session_state.weights.items():
-        portfolio_returns += returns[ticker] * weight
+    portfolio_returns = weighted_returns(returns, st.session_state.weights)
     
     # Cumulative returns
-    cumulative_returns = (1 + returns).cumprod()
-    portfolio_cumulative_returns = (1 + portfolio_returns).cumprod()
+    cumulative_returns = compound_returns(returns)
+    portfolio_cumulative_returns = compound_returns(portfolio_returns)
     
     st.subheader("Portfolio Metrics")
 # Portfolio statistics
@@ -195,13 +210,8 @@ try:
     # After the monthly returns heatmap, add new sections for risk metrics and analysis
     st.subheader("Risk Metrics")
     
-    # Fetch market data (S&P 500 as benchmark)
-    benchmark = yf.Ticker("^GSPC")
-    market_returns = benchmark.history(start=st.session_state.start_date, 
-                                     end=st.session_state.end_date)['Close'].pct_change()
-    
     # Calculate and display risk metrics
-    risk_metrics = calculate_risk_metrics(portfolio_returns)
+    risk_metrics = calculate_risk_metrics(portfolio_returns, market_returns)
     
     # Display risk metrics in columns
     col1, col2, col3 = st.columns(3)
@@ -218,7 +228,7 @@ try:
     fig = go.Figure()
     
     # Add individual stock returns
-    for ticker in st.session_state.tickers:
+    for ticker in cumulative_returns.columns:
         fig.add_trace(go.Scatter(
             x=cumulative_returns.index,
             y=cumulative_returns[ticker],
@@ -343,7 +353,7 @@ try:
 
     # Risk Contribution Analysis
     st.subheader("Risk Contribution Analysis")
-    weights_array = np.array([st.session_state.weights[ticker] for ticker in st.session_state.tickers])
+    weights_array = np.array([st.session_state.weights.get(ticker, 0) for ticker in returns.columns])
     risk_contrib_fig = plot_risk_contribution(returns, weights_array)
     st.plotly_chart(risk_contrib_fig, use_container_width=True)
 
@@ -1,11 +1,12 @@
 import streamlit as st
-import yfinance as yf
-import pandas as pd
 import numpy as np
 import quantstats as qs
 import plotly.graph_objects as go
 from datetime import datetime
 
+from market_data import (BENCHMARKS, RETURN_FIELDS, FetchBudget, config, data_age_caption,
+                         load_close_matrices, show_quality_notes, show_window_note, weighted_returns)
+
 st.set_page_config(page_title="Risk Metrics", page_icon="📊", layout="wide")
 
 # Check if portfolio is configured
@@ -14,38 +15,34 @@ if 'tickers' not in st.session_state:
     st.stop()
 
 # Benchmark selection
-benchmark = st.sidebar.selectbox("Select Benchmark", ["SPY", "^GSPC", "^DJI", "^IXIC"], index=0)
+benchmark = st.sidebar.selectbox("Select Benchmark", BENCHMARKS, index=0)
+
+# Total return reinvests dividends, price return ignores them
+return_basis = st.sidebar.radio("Returns", list(RETURN_FIELDS), index=0)
 
 # Main content
 st.title("📊 Risk Metrics Analysis")
 
-@st.cache_data
-def fetch_data(tickers, benchmark, start_date, end_date):
-    data = pd.DataFrame()
-    # Fetch stock data
-    for ticker in tickers:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(start=start_date, end=end_date)['Close']
-        data[ticker] = hist
-    
-    # Fetch benchmark data
-    bench = yf.Ticker(benchmark)
-    benchmark_data = bench.history(start=start_date, end=end_date)['Close']
-    data[benchmark] = benchmark_data
-    
-    return data
-
 try:
-    # Fetch data
-    df = fetch_data(st.session_state.tickers, benchmark, st.session_state.start_date, st.session_state.end_date)
-    
-    # Calculate returns
-    returns = df.pct_change()
-    
+    # Fetch data. Constituents and benchmark are cached per ticker, so switching
+    # the benchmark only downloads the new symbol and switching the return basis
+    # downloads nothing
+    fetch_budget = FetchBudget(config.PAGE_FETCH_BUDGET)
+    df, returns, failed_tickers, late_listings = load_close_matrices(st.session_state.tickers, benchmark, st.session_state.start_date, st.session_state.end_date, fetch_budget, RETURN_FIELDS[return_basis])
+    if failed_tickers:
+        st.warning("Could not load data for: " + ", ".join(
+            f"{ticker} ({error})" for ticker, error in failed_tickers.items()))
+    if benchmark not in df.columns:
+        st.error(f"No data available for benchmark {benchmark}.")
+        st.stop()
+    
+    st.caption(data_age_caption(df.columns, start_date=st.session_state.start_date,
+                                end_date=st.session_state.end_date, field=RETURN_FIELDS[return_basis]))
+    show_quality_notes(df.columns)
+    show_window_note(df, late_listings)
+
     # Calculate portfolio returns
-    portfolio_returns = pd.Series(0, index=returns.index)
-    for ticker, weight in st.session_state.weights.items():
-        portfolio_returns += returns[ticker] * weight
+    portfolio_returns = weighted_returns(returns, st.session_state.weights)
     
     benchmark_returns = returns[benchmark]
     
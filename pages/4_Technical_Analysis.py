@@ -1,10 +1,12 @@
 import streamlit as st
-import yfinance as yf
 import plotly.graph_objects as go
 from datetime import datetime
 import pandas as pd
 import numpy as np
 
+from market_data import (FetchBudget, config, data_age_caption, get_bars, get_intraday_bars,
+                         show_quality_notes)
+
 st.set_page_config(page_title="Technical Analysis", page_icon="📊", layout="wide")
 
 # Get first ticker from session state for technical analysis
@@ -25,36 +27,69 @@ show_ma = st.sidebar.checkbox("Moving Averages", True)
 show_bb = st.sidebar.checkbox("Bollinger Bands", False)
 show_rsi = st.sidebar.checkbox("RSI", True)
 
+# Bar resolution; Auto keeps the candle count within what the chart can draw legibly.
+# Intraday resolutions show the latest bars regardless of the portfolio date range
+RESOLUTIONS = {"Daily": "1d", "Weekly": "1wk", "Monthly": "1mo", "5 Minutes": "5m", "1 Minute": "1m"}
+INTRADAY = {"5 Minutes", "1 Minute"}
+resolution_choice = st.sidebar.selectbox("Resolution", ["Auto", *RESOLUTIONS], index=0)
+
+# Approximate width of the chart in the wide layout and the narrowest readable candle
+CHART_WIDTH_PX = 1200
+MIN_CANDLE_PX = 3
+
+def choose_resolution(start_date, end_date, width_px=CHART_WIDTH_PX):
+    max_candles = width_px // MIN_CANDLE_PX
+    sessions = len(pd.bdate_range(start_date, end_date))
+    if sessions <= max_candles:
+        return "Daily"
+    if sessions / 5 <= max_candles:
+        return "Weekly"
+    return "Monthly"
+
 # Fetch data
-@st.cache_data
-def fetch_data(ticker, start_date, end_date):
-    stock = yf.Ticker(ticker)
-    df = stock.history(start=start_date, end=end_date)
-    return df
+def fetch_data(ticker, start_date, end_date, resolution):
+    # Read-only view of the shared bars (weekly and monthly ones are precomputed)
+    # and the error of a failed intraday update; indicators go into their own frame
+    budget = FetchBudget(config.PAGE_FETCH_BUDGET)
+    if resolution in INTRADAY:
+        return get_intraday_bars(ticker, RESOLUTIONS[resolution], budget=budget)
+    return get_bars(ticker, start_date, end_date, RESOLUTIONS[resolution], budget=budget), None
 
 # Main content
 st.title(f"📊 Technical Analysis - {ticker}")
 
 try:
-    df = fetch_data(ticker, st.session_state.start_date, st.session_state.end_date)
+    resolution = resolution_choice
+    if resolution == "Auto":
+        resolution = choose_resolution(st.session_state.start_date, st.session_state.end_date)
+    df, update_error = fetch_data(ticker, st.session_state.start_date, st.session_state.end_date, resolution)
+    if resolution in INTRADAY:
+        if update_error:
+            st.warning(f"Could not update intraday bars, showing bars up to "
+                       f"{df.index[-1]:%Y-%m-%d %H:%M} ({update_error})")
+        st.caption(f"Latest {len(df)} intraday bars, updated at most every {config.INTRADAY_TTL} seconds")
+    else:
+        st.caption(data_age_caption([ticker]))
+        show_quality_notes([ticker])
     
     # Calculate technical indicators
+    indicators = pd.DataFrame(index=df.index)
     if show_ma:
-        df['MA20'] = df['Close'].rolling(window=20).mean()
-        df['MA50'] = df['Close'].rolling(window=50).mean()
-        df['MA200'] = df['Close'].rolling(window=200).mean()
+        indicators['MA20'] = df['Close'].rolling(window=20).mean()
+        indicators['MA50'] = df['Close'].rolling(window=50).mean()
+        indicators['MA200'] = df['Close'].rolling(window=200).mean()
     
     if show_bb:
-        df['BB_middle'] = df['Close'].rolling(window=20).mean()
-        df['BB_upper'] = df['BB_middle'] + 2 * df['Close'].rolling(window=20).std()
-        df['BB_lower'] = df['BB_middle'] - 2 * df['Close'].rolling(window=20).std()
+        indicators['BB_middle'] = df['Close'].rolling(window=20).mean()
+        indicators['BB_upper'] = indicators['BB_middle'] + 2 * df['Close'].rolling(window=20).std()
+        indicators['BB_lower'] = indicators['BB_middle'] - 2 * df['Close'].rolling(window=20).std()
     
     if show_rsi:
         delta = df['Close'].diff()
         gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
         loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
         rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
+        indicators['RSI'] = 100 - (100 / (1 + rs))
 
     # Create candlestick chart
     fig = go.Figure()
@@ -69,16 +104,16 @@ try:
     ))
 
     if show_ma:
-        fig.add_trace(go.Scatter(x=df.index, y=df['MA20'], name='MA20', line=dict(color='blue')))
-        fig.add_trace(go.Scatter(x=df.index, y=df['MA50'], name='MA50', line=dict(color='orange')))
-        fig.add_trace(go.Scatter(x=df.index, y=df['MA200'], name='MA200', line=dict(color='red')))
+        fig.add_trace(go.Scatter(x=df.index, y=indicators['MA20'], name='MA20', line=dict(color='blue')))
+        fig.add_trace(go.Scatter(x=df.index, y=indicators['MA50'], name='MA50', line=dict(color='orange')))
+        fig.add_trace(go.Scatter(x=df.index, y=indicators['MA200'], name='MA200', line=dict(color='red')))
 
     if show_bb:
-        fig.add_trace(go.Scatter(x=df.index, y=df['BB_upper'], name='BB Upper', line=dict(color='gray', dash='dash')))
-        fig.add_trace(go.Scatter(x=df.index, y=df['BB_lower'], name='BB Lower', line=dict(color='gray', dash='dash')))
+        fig.add_trace(go.Scatter(x=df.index, y=indicators['BB_upper'], name='BB Upper', line=dict(color='gray', dash='dash')))
+        fig.add_trace(go.Scatter(x=df.index, y=indicators['BB_lower'], name='BB Lower', line=dict(color='gray', dash='dash')))
 
     fig.update_layout(
-        title=f'{ticker} Price Chart',
+        title=f'{ticker} Price Chart ({resolution})',
         yaxis_title='Price',
         xaxis_title='Date',
         template='plotly_dark',
@@ -92,7 +127,7 @@ try:
     # Display RSI if selected
     if show_rsi:
         rsi_fig = go.Figure()
-        rsi_fig.add_trace(go.Scatter(x=df.index, y=df['RSI'], name='RSI'))
+        rsi_fig.add_trace(go.Scatter(x=df.index, y=indicators['RSI'], name='RSI'))
         rsi_fig.add_hline(y=70, line_dash="dash", line_color="red")
         rsi_fig.add_hline(y=30, line_dash="dash", line_color="green")
         rsi_fig.update_layout(
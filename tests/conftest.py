@@ -0,0 +1,17 @@
+import pytest
+
+from market_data import cache, intraday, scheduler
+from market_data.resilience import CircuitBreaker
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Install a provider for the fetch scheduler the price and intraday caches use."""
+    def install(stub):
+        sched = scheduler.FetchScheduler(scheduler.TokenBucket(1000, 1000), CircuitBreaker(), max_retries=0,
+                                         base_delay=0.01, call_timeout=5.0)
+        monkeypatch.setattr(scheduler, "get_provider", lambda: stub)
+        monkeypatch.setattr(cache, "get_scheduler", lambda: sched)
+        monkeypatch.setattr(intraday, "get_scheduler", lambda: sched)
+        return stub
+    return install
@@ -0,0 +1,46 @@
+"""Stand-ins for the market data provider used across the tests."""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from market_data.providers import MarketDataProvider
+
+
+def daily_bars(start, periods, close=None):
+    """Business-day OHLCV bars whose Close defaults to 1, 2, 3, ..."""
+    index = pd.bdate_range(start, periods=periods)
+    close = np.arange(1.0, periods + 1) if close is None else np.asarray(close, dtype="float64")
+    return pd.DataFrame({"Open": close, "High": close + 0.5, "Low": close - 0.5, "Close": close,
+                         "Volume": 1000.0, "Dividends": 0.0, "Stock Splits": 0.0}, index=index)
+
+
+class FrameProvider(MarketDataProvider):
+    """Serves fixed {ticker: bars} frames and records the tickers it was asked for.
+
+    With a ``gate`` event, every call blocks until the event is set.
+    """
+
+    name = "frames"
+
+    def __init__(self, frames, gate=None):
+        self.frames = dict(frames)
+        self.gate = gate
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def history(self, tickers, start_date, end_date, interval="1d"):
+        with self._lock:
+            self.requested.extend(tickers)
+        if self.gate is not None:
+            self.gate.wait()
+        frames, failures = {}, {}
+        for ticker in tickers:
+            frame = self.frames.get(ticker)
+            if frame is None:
+                failures[ticker] = "No data returned"
+                continue
+            frames[ticker] = frame.loc[(frame.index >= start_date) & (frame.index < end_date)]
+        if not frames:
+            return pd.DataFrame(), failures
+        return pd.concat(frames, axis=1), failures
@@ -0,0 +1,140 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from market_data.cache import PriceCache
+from market_data.resilience import FetchBudget
+from market_data.store import BarStore
+from tests.stubs import FrameProvider, daily_bars
+
+
+def test_weekly_bars_only_aggregate_the_requested_days(provider, tmp_path):
+    provider(FrameProvider({"X": daily_bars("2024-01-01", 23)}))  # Jan 1 .. Jan 31
+    cache = PriceCache(BarStore(tmp_path))
+    cache.get_history(["X"], "2024-01-01", "2024-02-01")
+
+    bars, error = cache.get_bars("X", "2024-01-10", "2024-01-24", "1wk")
+    assert error is None
+    assert bars.index.tolist() == [pd.Timestamp("2024-01-08"), pd.Timestamp("2024-01-15"),
+                                   pd.Timestamp("2024-01-22")]
+    # Jan 10 is the 8th session, Jan 23 the 17th
+    assert bars["Open"].tolist() == [8.0, 11.0, 16.0]
+    assert bars["Close"].tolist() == [10.0, 15.0, 17.0]
+    assert bars["Volume"].tolist() == [3000.0, 5000.0, 2000.0]
+
+
+def test_refreshing_a_close_only_entry_stores_full_bars(provider, tmp_path):
+    stub = provider(FrameProvider({"X": daily_bars("2024-01-01", 23)}))
+    store = BarStore(tmp_path)
+    cache = PriceCache(store, ttl=0)
+    cache.get_history(["X"], "2024-01-01", "2024-02-01", columns=("Close",))
+
+    # The provider revises the series; the refresh re-downloads the week before its last bar
+    stub.frames["X"] = daily_bars("2024-01-01", 23, close=[float(i) for i in range(101, 124)])
+    cache._refresh("X", "1d")
+
+    stored = store.read("X", "1d", pd.Timestamp("2024-01-24"), pd.Timestamp("2024-02-01"))
+    assert stored["Open"].tolist() == [118.0, 119.0, 120.0, 121.0, 122.0, 123.0]
+    assert stored["Volume"].notna().all()
+    frames, _ = cache.get_history(["X"], "2024-01-29", "2024-02-01", columns=("Close",))
+    assert frames["X"].columns.tolist() == ["Close"]
+    assert frames["X"]["Close"].tolist() == [121.0, 122.0, 123.0]
+
+
+def test_concurrent_sessions_download_a_series_once(provider):
+    gate = threading.Event()
+    stub = provider(FrameProvider({"X": daily_bars("2024-01-01", 23)}, gate=gate))
+    cache, results = PriceCache(), []
+
+    def session():
+        results.append(cache.get_history(["X"], "2024-01-01", "2024-02-01"))
+    sessions = [threading.Thread(target=session) for _ in range(3)]
+    sessions[0].start()
+    while not stub.requested:
+        time.sleep(0.005)
+    for thread in sessions[1:]:
+        thread.start()
+    while cache.flights.stats()["coalesced"] < 2:
+        time.sleep(0.005)
+
+    # A page out of budget stops waiting for the other session's download
+    frames, failures = cache.get_history(["X"], "2024-01-01", "2024-02-01", budget=FetchBudget(0.05))
+    assert frames == {} and failures == {"X": "Fetch budget exceeded"}
+
+    gate.set()
+    for thread in sessions:
+        thread.join(5)
+    assert stub.requested == ["X"]
+    assert [len(frames["X"]) for frames, failures in results] == [23, 23, 23]
+    assert all(failures == {} for frames, failures in results)
+
+
+def test_cached_tickers_are_sliced_without_a_request(provider):
+    stub = provider(FrameProvider({"X": daily_bars("2024-01-01", 23), "Y": daily_bars("2024-01-01", 23)}))
+    cache = PriceCache()
+    cache.get_history(["X"], "2024-01-01", "2024-02-01")
+
+    frames, failures = cache.get_history(["X", "Y", "Z"], "2024-01-08", "2024-01-13")
+    assert stub.requested == ["X", "Y", "Z"]
+    assert frames["X"]["Close"].tolist() == [6.0, 7.0, 8.0, 9.0, 10.0]
+    assert frames["Y"].index.equals(frames["X"].index)
+    assert failures == {"Z": "No data returned"}
+
+    # Neither the cached series nor a symbol the provider doesn't know are asked for again
+    frames, failures = cache.get_history(["Y", "X", "Z"], "2024-01-09", "2024-01-11")
+    assert stub.requested == ["X", "Y", "Z"]
+    assert list(frames) == ["Y", "X"] and len(frames["Y"]) == 2
+    assert failures == {"Z": "No data returned"}
+
+
+def test_matrices_are_shared_until_a_series_changes(provider):
+    provider(FrameProvider({"X": daily_bars("2024-01-01", 30), "Y": daily_bars("2024-01-01", 30)}))
+    cache = PriceCache()
+    record, failures = cache.get_matrix(["X", "Y"], "2024-01-01", "2024-02-01")
+    assert failures == {}
+    assert record.prices.columns.tolist() == ["X", "Y"] and len(record.prices) == 23
+    assert not record.prices.to_numpy().flags.writeable
+
+    again, _ = cache.get_matrix(["X", "Y"], "2024-01-01", "2024-02-01")
+    assert again is record
+    assert record.aligned is record.aligned  # derived once per record
+
+    # Extending X's range replaces its cache entry, so the matrix is rebuilt
+    cache.get_history(["X"], "2024-01-01", "2024-02-10")
+    rebuilt, _ = cache.get_matrix(["X", "Y"], "2024-01-01", "2024-02-01")
+    assert rebuilt is not record
+    assert rebuilt.prices.equals(record.prices)
+
+
+def test_stale_entries_are_served_while_refreshing_in_the_background(provider):
+    stub = provider(FrameProvider({"X": daily_bars("2024-01-01", 23)}))
+    cache = PriceCache(ttl=0)
+    cache.get_history(["X"], "2024-01-01", "2024-02-01")
+
+    stub.frames["X"] = daily_bars("2024-01-01", 23, close=[float(i) for i in range(101, 124)])
+    frames, _ = cache.get_history(["X"], "2024-01-01", "2024-02-01")
+    assert frames["X"]["Close"].iloc[-1] == 23.0
+
+    deadline = time.monotonic() + 5
+    while cache._entries[("X", "1d")].frame["Close"].iloc[-1] != 123.0:
+        assert time.monotonic() < deadline, "the stale entry was never refreshed"
+        time.sleep(0.01)
+    # Only the last week was downloaded again
+    assert cache._entries[("X", "1d")].frame["Close"].iloc[0] == 1.0
+
+
+def test_a_failed_refresh_clears_the_refreshing_flag(provider, monkeypatch):
+    provider(FrameProvider({"X": daily_bars("2024-01-01", 23)}))
+    cache = PriceCache(ttl=0)
+    cache.get_history(["X"], "2024-01-01", "2024-02-01")
+    entry = cache._entries[("X", "1d")]
+    entry.refreshing = True
+
+    def fail(key, entry):
+        raise OSError("store unreadable")
+    monkeypatch.setattr(cache, "_refresh_entry", fail)
+    with pytest.raises(OSError):
+        cache._refresh("X", "1d")
+    assert not entry.refreshing
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from market_data.calendar import align_prices, late_starts
+
+
+def test_only_gaps_up_to_max_fill_are_carried_over():
+    index = pd.bdate_range("2024-01-01", periods=10)
+    prices = pd.DataFrame({"A": [1.0, np.nan, 2.0, np.nan, np.nan, np.nan, np.nan, 3.0, np.nan, 4.0],
+                           "B": np.arange(10.0)}, index=index)
+    aligned = align_prices(prices, max_fill=3)
+    assert aligned["A"].tolist()[:3] == [1.0, 1.0, 2.0]
+    assert aligned["A"].iloc[3:7].isna().all()
+    assert aligned["A"].tolist()[7:] == [3.0, 3.0, 4.0]
+
+
+def test_calendar_starts_once_every_column_has_a_price():
+    index = pd.bdate_range("2024-01-01", periods=8)
+    prices = pd.DataFrame({"A": np.arange(8.0), "B": [np.nan] * 5 + [1.0, 2.0, 3.0]}, index=index)
+    assert align_prices(prices).index[0] == index[5]
+    assert late_starts(prices, max_gap=3) == {"B": index[5]}
@@ -0,0 +1,25 @@
+import pytest
+
+from market_data.files import write_atomic
+
+
+def test_write_atomic_replaces_the_file_and_leaves_no_temporaries(tmp_path):
+    path = tmp_path / "nested" / "data.txt"
+    write_atomic(path, lambda tmp: tmp.write_text("one"))
+    write_atomic(path, lambda tmp: tmp.write_text("two"))
+    assert path.read_text() == "two"
+    assert [p.name for p in path.parent.iterdir()] == ["data.txt"]
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("old")
+
+    def write(tmp):
+        tmp.write_text("partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        write_atomic(path, write)
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.txt"]
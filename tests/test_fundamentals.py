@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from market_data import fundamentals
+from market_data.fundamentals import InfoCache, _fetch_and_cache
+from market_data.resilience import CircuitBreaker
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.05)
+    monkeypatch.setattr(fundamentals, "get_breaker", lambda: breaker)
+    return breaker
+
+
+def half_open(breaker):
+    breaker.record_failure()
+    time.sleep(0.06)
+
+
+def fail_with(monkeypatch, error):
+    def fetch_info(ticker):
+        raise error
+    monkeypatch.setattr(fundamentals, "fetch_info", fetch_info)
+
+
+def test_unknown_ticker_ends_a_half_open_trial(breaker, monkeypatch):
+    half_open(breaker)
+    fail_with(monkeypatch, ValueError("No info file for XYZ"))
+    with pytest.raises(ValueError):
+        _fetch_and_cache(InfoCache(ttl=60), "XYZ")
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_transient_error_reopens_the_breaker(breaker, monkeypatch):
+    half_open(breaker)
+    fail_with(monkeypatch, ConnectionError("connection reset"))
+    with pytest.raises(ConnectionError):
+        _fetch_and_cache(InfoCache(ttl=60), "AAPL")
+    assert breaker.state == "open"
+
+
+def test_fetched_info_is_cached(breaker, monkeypatch):
+    calls = []
+    monkeypatch.setattr(fundamentals, "fetch_info", lambda ticker: calls.append(ticker) or {"symbol": ticker})
+    cache = InfoCache(ttl=60)
+    assert _fetch_and_cache(cache, "AAPL") == {"symbol": "AAPL"}
+    assert _fetch_and_cache(cache, "AAPL") == {"symbol": "AAPL"}
+    assert calls == ["AAPL"]
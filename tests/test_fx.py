@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from market_data.fx import convert_prices, fx_pairs, normalize_currency
+
+
+def test_minor_units_and_pairs():
+    assert normalize_currency("GBp") == ("GBP", 0.01)
+    assert normalize_currency("eur") == ("EUR", 1.0)
+    assert fx_pairs({"A": "GBp", "B": "EUR", "C": "USD"}, "USD") == ["EURUSD=X", "GBPUSD=X"]
+
+
+def test_convert_prices_broadcasts_rates_and_fills_fx_holidays():
+    index = pd.bdate_range("2024-01-01", periods=3)
+    prices = pd.DataFrame({"US": [1.0, 2.0, 3.0], "UK": [100.0, 200.0, 300.0], "EU": [1.0, 1.0, 1.0]},
+                          index=index)
+    # No GBP rate on the second session
+    rates = pd.DataFrame({"GBPUSD=X": [1.25, np.nan, 1.5]}, index=index).dropna()
+    converted = convert_prices(prices, {"UK": "GBp", "EU": "EUR"}, rates, "USD")
+    np.testing.assert_allclose(converted["US"], [1.0, 2.0, 3.0])
+    np.testing.assert_allclose(converted["UK"], [1.25, 2.5, 4.5])
+    assert converted["EU"].isna().all()
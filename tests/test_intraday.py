@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_data.intraday import COLUMNS, IntradayCache, RingBuffer
+from market_data.store import BarStore
+from tests.stubs import FrameProvider
+
+
+def bars(times):
+    times = np.asarray(times, dtype="int64")
+    return times, np.repeat(times[:, None].astype("float64"), 5, axis=1)
+
+
+def test_view_holds_the_latest_capacity_bars():
+    buffer = RingBuffer(3)
+    buffer.extend(*bars([1, 2]))
+    assert len(buffer) == 2
+    buffer.extend(*bars([3, 4, 5, 6, 7]))
+    times, values = buffer.view()
+    assert times.tolist() == [5, 6, 7]
+    assert values[:, 0].tolist() == [5.0, 6.0, 7.0]
+    assert buffer.last_time == 7
+
+
+def test_compaction_spills_older_bars_and_keeps_views_valid():
+    spilled = []
+    buffer = RingBuffer(2, spill=lambda times, values: spilled.extend(times.tolist()))
+    buffer.extend(*bars([1, 2, 3, 4]))
+    before, _ = buffer.view()
+    buffer.extend(*bars([5]))
+    assert spilled == [1, 2]
+    assert before.tolist() == [3, 4]
+    assert buffer.view()[0].tolist() == [4, 5]
+
+
+def test_views_are_read_only_and_last_bar_can_change():
+    buffer = RingBuffer(4)
+    buffer.extend(*bars([1, 2]))
+    buffer.replace_last(np.full(5, 9.0))
+    times, values = buffer.view()
+    assert values[-1].tolist() == [9.0] * 5
+    with pytest.raises(ValueError):
+        values[0, 0] = 0.0
+
+
+class WatchedStore(BarStore):
+    """Records whether the intraday cache lock was held during each archive write."""
+
+    def __init__(self, root, cache_lock):
+        super().__init__(root)
+        self.cache_lock = cache_lock
+        self.locked = []
+
+    def archive(self, symbol, interval, frame):
+        self.locked.append(self.cache_lock())
+        super().archive(symbol, interval, frame)
+
+
+def test_spilled_bars_are_archived_per_day_outside_the_lock(provider, tmp_path):
+    # Minute bars over the last two days, a few more than the buffer holds
+    now = pd.Timestamp.now(tz="UTC").floor("min")
+    index = pd.date_range(now - pd.Timedelta(days=2), now - pd.Timedelta(minutes=1), freq="90min")
+    provider(FrameProvider({"X": pd.DataFrame({c: np.arange(len(index), dtype="float64") for c in COLUMNS},
+                                               index=index)}))
+    cache = IntradayCache(capacity=8, ttl=0, lookback_days={"1m": 3, "5m": 3})
+    store = WatchedStore(tmp_path, lambda: cache._lock.locked())
+    cache._store = store
+
+    bars, error = cache.get_bars("X", "1m")
+    assert error is None
+    assert len(bars) == 8
+    assert store.locked and not any(store.locked)
+    # The oldest bars, one file per day they fall on
+    paths = sorted((tmp_path / "1m").glob("*/X.parquet"))
+    archived = pd.concat([pd.read_parquet(path) for path in paths]).index
+    assert len(archived) and archived.equals(index[:len(archived)])
+    assert [path.parent.name for path in paths] == sorted({f"{day:%Y-%m-%d}" for day in archived})
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from market_data.quality import clean_bars
+
+
+def bars(close, splits=None, start="2024-01-01"):
+    index = pd.bdate_range(start, periods=len(close))
+    frame = pd.DataFrame({"Close": close, "Volume": 1000.0}, index=index)
+    if splits is not None:
+        frame["Stock Splits"] = splits
+    return frame
+
+
+def test_clean_series_is_returned_unchanged():
+    frame = bars([10.0, 10.5, 10.2, 10.4])
+    cleaned, report = clean_bars(frame, freq="B")
+    assert report.clean
+    assert cleaned is frame
+
+
+def test_duplicates_keep_last_row():
+    frame = bars([10.0, 11.0, 12.0])
+    frame = pd.concat([frame, frame.iloc[[1]] * 2]).sort_index()
+    cleaned, report = clean_bars(frame)
+    assert report.duplicates == 1
+    assert cleaned["Close"].tolist() == [10.0, 22.0, 12.0]
+
+
+def test_short_gap_is_carried_forward():
+    frame = bars([10.0, 0.0, np.nan, 11.0])
+    cleaned, report = clean_bars(frame)
+    assert report.invalid_prices == 1
+    assert report.filled == 2
+    assert cleaned["Close"].tolist() == [10.0, 10.0, 10.0, 11.0]
+
+
+def test_long_gap_is_reported_and_left_empty():
+    frame = bars([10.0] + [np.nan] * 4 + [11.0])
+    cleaned, report = clean_bars(frame, max_fill=3)
+    assert report.filled == 0
+    assert report.long_gaps == [(frame.index[1], frame.index[4])]
+    assert cleaned["Close"].isna().sum() == 4
+
+
+def test_missing_sessions_are_found_with_freq():
+    frame = bars([10.0] * 10).drop(pd.bdate_range("2024-01-03", periods=4))
+    _, report = clean_bars(frame, freq="B")
+    assert report.long_gaps == [(pd.Timestamp("2024-01-03"), pd.Timestamp("2024-01-08"))]
+
+
+def test_confirmed_split_adjusts_earlier_history():
+    frame = bars([100.0, 102.0, 25.5, 26.0], splits=[0, 0, 4.0, 0])
+    cleaned, report = clean_bars(frame)
+    assert report.splits == [(frame.index[2], 0.25)]
+    np.testing.assert_allclose(cleaned["Close"], [25.0, 25.5, 25.5, 26.0])
+    np.testing.assert_allclose(cleaned["Volume"], [4000.0, 4000.0, 1000.0, 1000.0])
+
+
+def test_unconfirmed_split_like_jump_is_only_an_outlier():
+    frame = bars([100.0, 101.0, 50.5, 51.0], splits=[0, 0, 0, 0])
+    cleaned, report = clean_bars(frame)
+    assert report.splits == []
+    assert frame.index[2] in report.outliers
+    assert cleaned["Close"].tolist() == frame["Close"].tolist()
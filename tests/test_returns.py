@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from market_data.returns import total_return_index
+
+
+def test_without_dividends_total_return_is_the_close():
+    close = pd.Series([10.0, 11.0, 12.0])
+    pd.testing.assert_series_equal(total_return_index(close), close)
+    pd.testing.assert_series_equal(total_return_index(close, pd.Series([0.0, 0.0, 0.0])), close)
+
+
+def test_dividends_are_reinvested_from_their_ex_date():
+    index = pd.bdate_range("2024-01-01", periods=4)
+    close = pd.Series([10.0, 10.0, 9.5, 9.5], index=index)
+    dividends = pd.Series([0.0, 0.0, 0.5, 0.0], index=index)
+    index_values = total_return_index(close, dividends)
+    np.testing.assert_allclose(index_values, [10.0, 10.0, 9.5 * (1 + 0.5 / 9.5), 9.5 * (1 + 0.5 / 9.5)])
+    assert index_values.dtype == "float64"
+
+
+def test_float32_input_is_upcast():
+    close = pd.Series([10.0, 10.5], dtype="float32")
+    assert total_return_index(close, pd.Series([0.0, 0.1], dtype="float32")).dtype == "float64"
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from market_data import scheduler
+from market_data.providers import MarketDataProvider
+from market_data.resilience import CircuitBreaker, FetchBudget
+
+START, END = pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-03")
+
+
+class StubProvider(MarketDataProvider):
+    """Serial provider whose calls sleep for ``delay`` seconds, or until ``release`` is set."""
+
+    name = "stub"
+    serial = True
+
+    def __init__(self, delay=0.0, release=None):
+        self.delay = delay
+        self.release = release
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def history(self, tickers, start_date, end_date, interval="1d"):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        if self.release is not None:
+            self.release.wait()
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        index = pd.date_range(start_date, periods=2)
+        return pd.concat({t: pd.DataFrame({"Close": [1.0, 2.0]}, index=index) for t in tickers}, axis=1), {}
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    def install(stub):
+        monkeypatch.setattr(scheduler, "get_provider", lambda: stub)
+        return stub
+    return install
+
+
+def make_scheduler(breaker, call_timeout=1.0):
+    return scheduler.FetchScheduler(scheduler.TokenBucket(1000, 1000), breaker, max_concurrency=4,
+                                    batch_size=1, max_retries=0, base_delay=0.01, call_timeout=call_timeout)
+
+
+def fetch(sched, tickers, budget=None):
+    return {r.ticker: r.error for r in sched.fetch([(tickers, START, END, "1d")], budget=budget)}
+
+
+def test_waiting_in_line_does_not_count_towards_the_timeout(provider):
+    stub = provider(StubProvider(delay=0.2))
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+    errors = fetch(make_scheduler(breaker, call_timeout=0.3), ["A", "B", "C", "D"])
+    assert errors == {"A": None, "B": None, "C": None, "D": None}
+    assert stub.peak == 1
+    assert breaker.state == "closed"
+
+
+def test_calls_dropped_by_the_budget_never_reach_the_provider(provider):
+    stub = provider(StubProvider(delay=0.2))
+    errors = fetch(make_scheduler(CircuitBreaker()), ["A", "B", "C", "D"], FetchBudget(0.3))
+    assert list(errors.values()).count("Fetch budget exceeded") >= 2
+    time.sleep(0.5)
+    assert stub.calls < 4
+
+
+def test_hung_call_fails_waiters_and_opens_the_breaker(provider):
+    release = threading.Event()
+    provider(StubProvider(release=release))
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+    sched = make_scheduler(breaker, call_timeout=0.1)
+    try:
+        started = time.monotonic()
+        errors = fetch(sched, ["A", "B", "C"])
+        assert time.monotonic() - started < 1
+        assert all("timed out" in error for error in errors.values())
+        assert breaker.state == "open"
+        # Later fetches fail at once instead of waiting on the hung call
+        started = time.monotonic()
+        assert fetch(sched, ["D"])["D"] is not None
+        assert time.monotonic() - started < 0.5
+    finally:
+        release.set()
+
+
+def test_cancelled_trial_still_resolves_the_breaker(provider):
+    provider(StubProvider(delay=0.2))
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    sched = make_scheduler(breaker, call_timeout=1.0)
+    assert fetch(sched, ["A"], FetchBudget(0.05)) == {"A": "Fetch budget exceeded"}
+    time.sleep(0.3)  # the abandoned trial finishes in the background
+    assert breaker.state == "closed"
+    assert breaker.allow()
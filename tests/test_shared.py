@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pandas as pd
+
+from market_data.cache import PriceCache
+from market_data.shared import SharedCache
+from market_data.store import BarStore
+from tests.stubs import FrameProvider, daily_bars
+
+
+def test_values_expire_by_the_readers_max_age(tmp_path):
+    shared = SharedCache(tmp_path / "shared.sqlite")
+    shared.put("info", "X", {"sector": "Tech"})
+
+    value, stored_at = SharedCache(tmp_path / "shared.sqlite").get("info", "X")
+    assert value == {"sector": "Tech"} and stored_at <= time.time()
+    time.sleep(0.02)
+    assert shared.get("info", "X", max_age=0.01) is None
+    assert shared.get("info", "Y") is None
+
+
+def test_a_lease_has_one_holder_until_released(tmp_path):
+    first = SharedCache(tmp_path / "shared.sqlite")
+    second = SharedCache(tmp_path / "shared.sqlite")
+    assert first.acquire("prices/X/1d")
+    assert not second.acquire("prices/X/1d")
+
+    # Only the holder can release it
+    second.release("prices/X/1d")
+    assert not second.wait(["prices/X/1d"], timeout=0.05, poll=0.01)
+    first.release("prices/X/1d")
+    assert second.wait(["prices/X/1d"], timeout=0.05, poll=0.01)
+    assert second.acquire("prices/X/1d")
+
+
+def test_another_thread_cannot_release_a_lease(tmp_path):
+    shared = SharedCache(tmp_path / "shared.sqlite")
+    assert shared.acquire("prices/X/1d")
+    thread = threading.Thread(target=shared.release, args=("prices/X/1d",))
+    thread.start()
+    thread.join(2)
+    assert not shared.wait(["prices/X/1d"], timeout=0.05, poll=0.01)
+
+
+def test_an_expired_lease_can_be_taken_over(tmp_path):
+    dead = SharedCache(tmp_path / "shared.sqlite", lease_ttl=0.05)
+    assert dead.acquire("prices/X/1d")
+    other = SharedCache(tmp_path / "shared.sqlite", lease_ttl=0.05)
+    assert other.wait(["prices/X/1d"], timeout=1, poll=0.01)
+    assert other.acquire("prices/X/1d")
+
+
+def test_a_process_waits_for_the_lease_holders_download(provider, tmp_path):
+    stub = provider(FrameProvider({"X": daily_bars("2024-01-01", 23)}))
+    store = BarStore(tmp_path / "bars")
+    holder = SharedCache(tmp_path / "shared.sqlite")
+    cache = PriceCache(store, shared=SharedCache(tmp_path / "shared.sqlite"))
+    assert holder.acquire("prices/X/1d")
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(
+        cache.get_history(["X"], "2024-01-01", "2024-02-01")))
+    thread.start()
+    time.sleep(0.3)
+    assert stub.requested == [] and not results
+
+    # The other process finishes its download into the store and lets go
+    store.append("X", "1d", daily_bars("2024-01-01", 23), pd.Timestamp("2024-01-01"),
+                 pd.Timestamp("2024-02-01"))
+    holder.release("prices/X/1d")
+    thread.join(5)
+
+    [(frames, failures)] = results
+    assert failures == {} and len(frames["X"]) == 23
+    assert stub.requested == []
@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from market_data.singleflight import SingleFlight
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition never became true"
+        time.sleep(0.005)
+
+
+def start_caller(flights, key, results, fn=lambda: "follower ran"):
+    def call():
+        try:
+            results.append(flights.do(key, fn))
+        except Exception as e:
+            results.append(e)
+    thread = threading.Thread(target=call)
+    thread.start()
+    return thread
+
+
+def test_concurrent_callers_share_the_leaders_result():
+    flights, release, calls, results = SingleFlight(), threading.Event(), [], []
+
+    def fetch():
+        calls.append(1)
+        release.wait()
+        return "bars"
+
+    leader = start_caller(flights, "X", results, fetch)
+    wait_for(lambda: calls)
+    followers = [start_caller(flights, "X", results) for _ in range(3)]
+    wait_for(lambda: flights.stats()["coalesced"] == 3)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(2)
+
+    assert results == ["bars"] * 4
+    assert len(calls) == 1
+    assert flights.stats() == {"requested": 4, "executed": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_leader_error_reaches_followers_and_the_key_is_freed():
+    flights, release, results = SingleFlight(), threading.Event(), []
+
+    def fetch():
+        release.wait()
+        raise ValueError("No data returned")
+
+    leader = start_caller(flights, "X", results, fetch)
+    wait_for(lambda: flights.stats()["in_flight"] == 1)
+    follower = start_caller(flights, "X", results)
+    wait_for(lambda: flights.stats()["coalesced"] == 1)
+    release.set()
+    leader.join(2)
+    follower.join(2)
+
+    assert [type(r) for r in results] == [ValueError, ValueError]
+    # The next caller leads a new fetch instead of seeing the old error
+    assert flights.do("X", lambda: "bars") == "bars"
+
+
+def test_follower_gives_up_after_its_timeout():
+    flights = SingleFlight()
+    leading, _ = flights.acquire(["X"])
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        flights.do("X", lambda: "follower ran", timeout=0.05)
+    assert time.monotonic() - started < 1
+
+    # The leader still publishes its result for anyone waiting
+    [key] = leading
+    flights.release(key, "bars")
+    assert flights.stats()["in_flight"] == 0
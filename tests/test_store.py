@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_data.store import BarStore, find_gaps, merge_ranges
+
+D = pd.Timestamp
+
+
+def test_merge_ranges_joins_overlapping_and_touching():
+    ranges = [(3, 5), (1, 2), (2, 3), (7, 9), (8, 10)]
+    assert merge_ranges(ranges) == [(1, 5), (7, 10)]
+
+
+def test_find_gaps():
+    covered = [(D("2024-01-05"), D("2024-01-10")), (D("2024-01-15"), D("2024-01-20"))]
+    assert find_gaps(covered, D("2024-01-01"), D("2024-01-25")) == [
+        (D("2024-01-01"), D("2024-01-05")),
+        (D("2024-01-10"), D("2024-01-15")),
+        (D("2024-01-20"), D("2024-01-25")),
+    ]
+    assert find_gaps(covered, D("2024-01-06"), D("2024-01-09")) == []
+    assert find_gaps([], D("2024-01-01"), D("2024-01-02")) == [(D("2024-01-01"), D("2024-01-02"))]
+
+
+def daily(start, close, splits=None):
+    index = pd.bdate_range(start, periods=len(close))
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1000.0,
+                         "Dividends": 0.0, "Stock Splits": splits or [0.0] * len(close)}, index=index)
+
+
+def append(store, frame):
+    store.append("X", "1d", frame, frame.index[0], frame.index[-1] + pd.Timedelta(days=1))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BarStore(tmp_path)
+
+
+def test_append_tracks_coverage(store):
+    append(store, daily("2024-01-01", [10.0] * 5))
+    assert store.missing_ranges("X", "1d", D("2024-01-01"), D("2024-01-10")) == [
+        (D("2024-01-06"), D("2024-01-10"))]
+
+
+def test_split_in_incremental_append_rescales_stored_bars(store):
+    # Stored before a 4:1 split, then a refresh tail that starts before the split session
+    append(store, daily("2024-01-01", [100.0, 101.0, 102.0, 103.0, 104.0]))
+    tail = daily("2024-01-04", [25.75, 26.0, 26.25, 26.5], splits=[0.0, 0.0, 4.0, 0.0])
+    append(store, tail)
+    # Replaying the same download must not apply the split twice
+    append(store, tail)
+
+    stored = store.read("X", "1d", D("2024-01-01"), D("2024-01-10"))
+    np.testing.assert_allclose(stored["Close"], [25.0, 25.25, 25.5, 25.75, 26.0, 26.25, 26.5])
+    np.testing.assert_allclose(stored["Volume"][:3], 4000.0)
+    assert stored["Close"].pct_change().abs().max() < 0.02
+
+
+def test_split_already_on_current_basis_is_left_alone(store):
+    # An earlier range downloaded after the split is already adjusted
+    append(store, daily("2024-01-01", [25.0, 25.25, 25.5]))
+    append(store, daily("2024-01-04", [25.75, 26.0], splits=[4.0, 0.0]))
+    stored = store.read("X", "1d", D("2024-01-01"), D("2024-01-10"))
+    np.testing.assert_allclose(stored["Close"], [25.0, 25.25, 25.5, 25.75, 26.0])
+
+
+
+def test_pyramid_is_built_from_cleaned_bars(store):
+    frame = daily("2024-01-01", [10.0, 11.0, 0.0, 12.0, 13.0, 14.0, 15.0, 16.0, 17.0, 18.0])
+    append(store, frame)
+    weekly = store.read_level("X", "1d", "1wk", D("2024-01-01"), D("2024-01-13"))
+    assert weekly.index.tolist() == [D("2024-01-01"), D("2024-01-08")]
+    assert weekly["Low"].min() == 10.0
+    assert weekly["Close"].tolist() == [13.0, 18.0]
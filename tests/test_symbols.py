@@ -0,0 +1,41 @@
+from market_data.symbols import (BUNDLED_FILE, SymbolDirectory, parse_tickers, read_entries,
+                                 validate_tickers, write_entries)
+
+DIRECTORY = SymbolDirectory([("AAPL", "Apple Inc."), ("MSFT", "Microsoft Corporation"),
+                             ("NVDA", "NVIDIA Corporation"), ("AMZN", "Amazon.com Inc.")])
+
+
+def test_parse_tickers_normalizes_and_dedupes():
+    assert parse_tickers(" aapl, msft  AAPL,,nvda ") == ["AAPL", "MSFT", "NVDA"]
+    assert parse_tickers(" , ") == []
+
+
+def test_validate_tickers_suggests_corrections_for_unknown_tickers():
+    known, unknown = validate_tickers(["AAPL", "MSTF", "JPM"], DIRECTORY)
+    assert known == ["AAPL"]
+    assert unknown["MSTF"][0] == "MSFT"
+    assert unknown["JPM"] == []
+
+
+def test_nasdaq_trader_listings_use_the_providers_symbols(tmp_path):
+    listing = tmp_path / "otherlisted.txt"
+    listing.write_text(
+        "ACT Symbol|Security Name|Exchange|CQS Symbol|ETF|Round Lot Size|Test Issue|NASDAQ Symbol\n"
+        "BRK.B|Berkshire Hathaway Inc. - Class B Common Stock|N|BRK.B|N|100|N|BRK.B\n"
+        "ABR$D|Arbor Realty Trust - 6.375% Series D Preferred Stock|N|ABRpD|N|100|N|ABR-D\n"
+        "ZXIET|IEX Test Company Test Symbol|V|ZXIET|N|100|Y|ZXIET\n"
+        "File Creation Time: 1016202418:00|||||||\n")
+    assert read_entries(listing) == [("BRK-B", "Berkshire Hathaway Inc."), ("ABR-PD", "Arbor Realty Trust")]
+
+    bundled = tmp_path / "symbols.csv"
+    write_entries([("MSFT", "Microsoft Corporation"), ("AAPL", "Apple Inc.")], bundled)
+    write_entries(read_entries(bundled) + read_entries(listing), bundled)
+    assert SymbolDirectory.from_file(bundled).search("berkshire")[0][0] == "BRK-B"
+    assert [symbol for symbol, _ in read_entries(bundled)] == ["AAPL", "ABR-PD", "BRK-B", "MSFT"]
+
+
+def test_bundled_directory_lists_us_stocks_and_etfs():
+    directory = SymbolDirectory.from_file(BUNDLED_FILE)
+    assert len(directory) > 5000
+    assert validate_tickers(["JPM", "XOM", "KO", "BRK-B", "SPY", "^GSPC"], directory)[1] == {}
+    assert directory.search("appl")[0][0] == "AAPL"